@@ -0,0 +1,270 @@
+"""Frame-cost benchmarks for all three game versions.
+
+Builds level variants at 1x, 10x and 100x the shipped size, drives each engine
+headlessly with the same scripted input and reports per-phase timings as JSON:
+    
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --engines v3 --scales 1 10 --frames 300 --output results.json
+
+Phases are update, collision, pickups and draw; 'other' is whatever else the
+frame spent (display flip, event pumping, camera bookkeeping). Each engine runs
+in its own subprocess from its own folder, because the three versions share
+module names (settings, level, player, tiles).
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINES = ('v1', 'v2', 'v3')
+SCALES = (1, 10, 100)
+PHASES = ('update', 'collision', 'pickups', 'draw')
+
+def scale_layout(layout, factor):
+    """Repeat a level layout sideways factor times.
+    
+    The player start stays in the first copy and the goal moves to the last one,
+    so terrain and coins grow in proportion while the level is still one run.
+    """
+    width = max(len(row) for row in layout)
+    rows = [row.ljust(width) for row in layout]
+    first = [row.replace('F', ' ') for row in rows]
+    middle = [row.replace('P', ' ').replace('F', ' ') for row in rows]
+    last = [row.replace('P', ' ') for row in rows]
+    if factor == 1:
+        return rows
+    return [first[i] + middle[i] * (factor - 2) + last[i] for i in range(len(rows))]
+
+class ScriptedKeys:
+    """Stand-in for pygame.key.get_pressed(): hold right, jump for 10 of every 45 frames"""
+    def __init__(self, right, space):
+        self.right = right
+        self.space = space
+        self.frame = 0
+    
+    def __getitem__(self, key):
+        if key == self.right:
+            return True
+        if key == self.space:
+            return self.frame % 45 < 10
+        return False
+
+class PhaseTimer:
+    """Accumulates time spent in wrapped callables, per phase and per frame"""
+    def __init__(self):
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frames = {phase: [] for phase in PHASES + ('other', 'frame')}
+    
+    def wrap(self, phase, func):
+        """Return func timed under the given phase"""
+        current = self.current
+        clock = time.perf_counter
+        def timed(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current[phase] += clock() - started
+        return timed
+    
+    def run_frame(self, frame, record=True):
+        """Run one frame callable and file its phase times"""
+        for phase in PHASES:
+            self.current[phase] = 0.0
+        started = time.perf_counter()
+        frame()
+        total = time.perf_counter() - started
+        if record:
+            for phase in PHASES:
+                self.frames[phase].append(self.current[phase])
+            self.frames['other'].append(total - sum(self.current.values()))
+            self.frames['frame'].append(total)
+    
+    def summary(self):
+        """Milliseconds per phase: total, mean, p95 and max over the recorded frames"""
+        result = {}
+        for phase, samples in self.frames.items():
+            ordered = sorted(samples)
+            count = len(ordered) or 1
+            result[phase] = {
+                'total_ms': round(sum(ordered) * 1000, 3),
+                'mean_ms': round(sum(ordered) / count * 1000, 4),
+                'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 4) if ordered else 0.0,
+                'max_ms': round(ordered[-1] * 1000, 4) if ordered else 0.0,
+            }
+        return result
+
+def setup_v1(pygame, timer, scale):
+    """v1: platform_game.step_frame, the body of main()'s loop, with its phases wrapped"""
+    import platform_game as game
+    game.LEVEL_WIDTH = game.SCREEN_WIDTH * 3 * scale
+    random.seed(0)
+    
+    player = game.Player(100, game.SCREEN_HEIGHT - 150)
+    platforms = game.generate_platforms()
+    stars = game.IntervalIndex(game.generate_stars(platforms))
+    platforms = game.IntervalIndex(platforms)
+    
+    # Player.move is input, gravity and the platform scan in one; the scan dominates
+    game.draw_frame = timer.wrap('draw', game.draw_frame)
+    game.collect_stars = timer.wrap('pickups', game.collect_stars)
+    game.update_scroll = timer.wrap('update', game.update_scroll)
+    player.move = timer.wrap('collision', player.move)
+    
+    def frame():
+        game.step_frame(player, platforms, stars)
+        pygame.event.pump()
+        pygame.display.update()
+    
+    info = {'level_width': game.LEVEL_WIDTH, 'platforms': len(platforms), 'stars': len(stars)}
+    return frame, info
+
+def setup_v2(pygame, timer, scale):
+    """v2: Level.run with its phases timed through wrapped groups and methods"""
+    from settings import level_map, SCREEN_WIDTH, SCREEN_HEIGHT
+    from level import Level
+    
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    layout = scale_layout(level_map, scale)
+    level = Level(layout, screen)
+    
+    def check_flag(elapsed_time):
+        # check_win shows the win screen and quits the process on desktop
+        if not level.game_won and pygame.sprite.spritecollide(level.player.sprite, level.flag, False):
+            level.game_won = True
+    
+    level.player.update = timer.wrap('update', level.player.update)
+    level.move_camera = timer.wrap('update', level.move_camera)
+    level.draw_tiles = timer.wrap('draw', level.draw_tiles)
+    level.draw_sprites = timer.wrap('draw', level.draw_sprites)
+    level.scroll_camera = timer.wrap('update', level.scroll_camera)
+    level.horizontal_movement_collision = timer.wrap('collision', level.horizontal_movement_collision)
+    level.vertical_movement_collision = timer.wrap('collision', level.vertical_movement_collision)
+    level.check_win = timer.wrap('pickups', check_flag)
+    
+    def frame():
+        screen.fill('skyblue')
+        level.run(0)
+        pygame.event.pump()
+        pygame.display.flip()
+    
+    info = {'columns': len(layout[0]), 'tiles': len(level.tiles)}
+    return frame, info
+
+def setup_v3(pygame, timer, scale):
+    """v3: Level.run with its phases timed through wrapped groups and methods"""
+    from settings import level_map, SCREEN_WIDTH, SCREEN_HEIGHT
+    from level import Level
+    
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    layout = scale_layout(level_map, scale)
+    level = Level(layout, screen)
+    
+    level.active_sprites.update = timer.wrap('update', level.active_sprites.update)
+    level.scheduler.update = timer.wrap('update', level.scheduler.update)
+    level.streamer.update = timer.wrap('update', level.streamer.update)
+    level.horizontal_movement_collision = timer.wrap('collision', level.horizontal_movement_collision)
+    level.vertical_movement_collision = timer.wrap('collision', level.vertical_movement_collision)
+    level.check_coin_collision = timer.wrap('pickups', level.check_coin_collision)
+    level.check_goal_collision = timer.wrap('pickups', level.check_goal_collision)
+    level.draw = timer.wrap('draw', level.draw)
+    
+    def frame():
+        screen.fill('skyblue')
+        level.run(0)
+        pygame.event.pump()
+        pygame.display.flip()
+    
+    info = {'columns': level.tilemap.width, 'terrain_tiles': len(level.terrain_tiles),
+            'coins': level.total_coins, 'clouds': len(level.cloud_sprites),
+            'chunks_loaded': len(level.streamer.loaded)}
+    return frame, info
+
+def run_engine(engine, scale, frames, warmup):
+    """Benchmark one engine at one scale in this process and return its result"""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    engine_dir = os.path.join(ROOT, engine)
+    os.chdir(engine_dir)
+    sys.path.insert(0, engine_dir)
+    
+    import pygame
+    pygame.init()
+    keys = ScriptedKeys(pygame.K_RIGHT, pygame.K_SPACE)
+    pygame.key.get_pressed = lambda: keys
+    
+    timer = PhaseTimer()
+    setup = {'v1': setup_v1, 'v2': setup_v2, 'v3': setup_v3}[engine]
+    started = time.perf_counter()
+    frame, info = setup(pygame, timer, scale)
+    setup_seconds = time.perf_counter() - started
+    
+    for index in range(warmup + frames):
+        keys.frame = index
+        timer.run_frame(frame, record=index >= warmup)
+    
+    phases = timer.summary()
+    frame_stats = phases.pop('frame')
+    return {
+        'engine': engine,
+        'scale': scale,
+        'frames': frames,
+        'setup_ms': round(setup_seconds * 1000, 2),
+        'level': info,
+        'frame': dict(frame_stats, fps=round(1000 / frame_stats['mean_ms'], 1) if frame_stats['mean_ms'] else None),
+        'phases': phases,
+    }
+
+def run_suite(engines, scales, frames, warmup):
+    """Run every engine/scale pair in a fresh interpreter and collect the results"""
+    results = []
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT='1')
+    for engine in engines:
+        for scale in scales:
+            command = [sys.executable, os.path.abspath(__file__), '--engine', engine,
+                       '--scale', str(scale), '--frames', str(frames), '--warmup', str(warmup)]
+            completed = subprocess.run(command, capture_output=True, text=True, env=env)
+            if completed.returncode != 0:
+                raise RuntimeError(f'{engine} x{scale} failed:\n{completed.stderr}')
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(f"{engine} x{scale}: {result['frame']['mean_ms']:.3f} ms/frame", file=sys.stderr)
+            results.append(result)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark frame cost of the v1, v2 and v3 engines')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--scales', nargs='+', type=int, default=list(SCALES))
+    parser.add_argument('--frames', type=int, default=600, help='measured frames per run')
+    parser.add_argument('--warmup', type=int, default=30, help='unmeasured frames before timing')
+    parser.add_argument('--output', metavar='PATH', help='write the JSON report here instead of stdout')
+    parser.add_argument('--engine', choices=ENGINES, help=argparse.SUPPRESS)
+    parser.add_argument('--scale', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.engine:
+        # Child process: one engine, one scale, JSON on the last line of stdout
+        print(json.dumps(run_engine(args.engine, args.scale, args.frames, args.warmup)))
+        return
+    
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'frames': args.frames,
+        'warmup': args.warmup,
+        'results': run_suite(args.engines, args.scales, args.frames, args.warmup),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as report_file:
+            report_file.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
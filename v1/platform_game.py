@@ -1,6 +1,7 @@
 import pygame
 import random
 import sys
+from bisect import bisect_left
 
 # Initialize pygame
 pygame.init()
@@ -25,6 +26,7 @@ clock = pygame.time.Clock()
 FPS = 60
 GRAVITY = 0.75
 SCROLL_THRESH = 200
+LEVEL_WIDTH = SCREEN_WIDTH * 3  # Platform, star, cloud and hill counts scale with this
 scroll = 0
 bg_scroll = 0
 score = 0
@@ -64,9 +66,9 @@ class Player:
             self.vel_y = 10
         dy += self.vel_y
         
-        # Check for collision with platforms
+        # Check for collision with platforms within reach of this move
         self.in_air = True
-        for platform in platforms:
+        for platform in platforms.near(self.rect.left - self.speed, self.rect.right + self.speed):
             # Check for collision in x direction
             if platform.rect.colliderect(self.rect.x + dx, self.rect.y, self.rect.width, self.rect.height):
                 dx = 0
@@ -124,16 +126,50 @@ class Star:
                 (self.rect.centerx + 5 - scroll, self.rect.centery - 5)
             ])
 
+# Index of platforms or stars along x
+class IntervalIndex:
+    """Objects with a rect, sorted by left edge so lookups along x are a bisect.
+    
+    A lookup only visits objects starting less than the widest object's width
+    before the range. Objects wider than max_span, like the ground, would make
+    that window the whole level, so they are kept apart and always checked.
+    """
+    def __init__(self, items, max_span=SCREEN_WIDTH):
+        self.items = list(items)
+        entries = sorted((item.rect.left, order) for order, item in enumerate(self.items)
+                         if item.rect.width <= max_span)
+        self.lefts = [left for left, order in entries]
+        self.orders = [order for left, order in entries]
+        self.max_width = max((self.items[order].rect.width for order in self.orders), default=0)
+        self.wide = [order for order, item in enumerate(self.items) if item.rect.width > max_span]
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def near(self, left, right):
+        """Objects overlapping x from left to right, in their original order"""
+        start = bisect_left(self.lefts, left - self.max_width + 1)
+        end = bisect_left(self.lefts, right)
+        orders = [order for order in self.orders[start:end] if self.items[order].rect.right > left]
+        orders.extend(order for order in self.wide
+                      if self.items[order].rect.left < right and self.items[order].rect.right > left)
+        # Same order as a full scan, since a platform hit changes how later ones resolve
+        orders.sort()
+        return [self.items[order] for order in orders]
+
 # Function to generate platforms
 def generate_platforms():
     platforms = []
     
     # Ground platform
-    platforms.append(Platform(0, SCREEN_HEIGHT - 50, SCREEN_WIDTH * 3, 50))
+    platforms.append(Platform(0, SCREEN_HEIGHT - 50, LEVEL_WIDTH, 50))
     
     # Generate random floating platforms
-    for i in range(20):
-        x = random.randint(100, SCREEN_WIDTH * 3 - 200)
+    for i in range(LEVEL_WIDTH // 120):
+        x = random.randint(100, LEVEL_WIDTH - 200)
         y = random.randint(SCREEN_HEIGHT - 350, SCREEN_HEIGHT - 100)
         width = random.randint(80, 150)
         platforms.append(Platform(x, y, width, 20))
@@ -145,8 +181,8 @@ def generate_stars(platforms):
     stars = []
     
     # Add stars on the ground
-    for i in range(15):
-        x = random.randint(50, SCREEN_WIDTH * 3 - 50)
+    for i in range(LEVEL_WIDTH // 160):
+        x = random.randint(50, LEVEL_WIDTH - 50)
         stars.append(Star(x, SCREEN_HEIGHT - 70))
     
     # Add stars on platforms
@@ -162,13 +198,13 @@ def draw_background(scroll):
     screen.fill((135, 206, 235))  # Sky blue
     
     # Draw clouds
-    for i in range(10):
-        x = (i * 200 - (bg_scroll * 0.5)) % (SCREEN_WIDTH * 3)
+    for i in range(LEVEL_WIDTH // 240):
+        x = (i * 200 - (bg_scroll * 0.5)) % LEVEL_WIDTH
         pygame.draw.ellipse(screen, WHITE, (x - scroll, 100, 100, 50))
     
     # Draw hills
-    for i in range(5):
-        x = (i * 400 - (bg_scroll * 0.6)) % (SCREEN_WIDTH * 3)
+    for i in range(LEVEL_WIDTH // 480):
+        x = (i * 400 - (bg_scroll * 0.6)) % LEVEL_WIDTH
         pygame.draw.polygon(screen, GREEN, [(x - 100 - scroll, SCREEN_HEIGHT - 50), 
                                           (x + 100 - scroll, SCREEN_HEIGHT - 50), 
                                           (x - scroll, SCREEN_HEIGHT - 150)])
@@ -178,56 +214,75 @@ def draw_text(text, font, color, x, y):
     img = font.render(text, True, color)
     screen.blit(img, (x, y))
 
+# Function to draw the level, player and score
+def draw_frame(player, platforms, stars):
+    # Draw background
+    draw_background(scroll)
+    
+    # Draw platforms
+    for platform in platforms.near(scroll, scroll + SCREEN_WIDTH):
+        platform.draw()
+    
+    # Draw stars
+    for star in stars.near(scroll, scroll + SCREEN_WIDTH):
+        star.draw()
+    
+    # Draw player
+    player.draw()
+    
+    # Draw score
+    draw_text(f'Score: {score}', font, BLACK, 20, 20)
+
+# Function to collect the stars the player touches
+def collect_stars(player, stars):
+    global score
+    
+    for star in stars.near(player.rect.left, player.rect.right):
+        if not star.collected and player.rect.colliderect(star.rect):
+            star.collected = True
+            score += 1
+
+# Function to scroll the view
+def update_scroll(player, scroll_change):
+    global scroll, bg_scroll
+    
+    scroll += scroll_change
+    bg_scroll += scroll_change
+    
+    # Handle scrolling
+    if player.rect.right > SCREEN_WIDTH - SCROLL_THRESH and player.direction > 0:
+        scroll += player.speed
+
+# Function to run one frame of the game, shared by main() and the benchmarks
+def step_frame(player, platforms, stars):
+    draw_frame(player, platforms, stars)
+    
+    # Check for star collection
+    collect_stars(player, stars)
+    
+    # Update player and scroll
+    update_scroll(player, player.move(platforms))
+    
+    # Game ends when the player falls off screen
+    return player.rect.top <= SCREEN_HEIGHT
+
 # Main function
 def main():
-    global scroll, bg_scroll, score
-    
     # Create player
     player = Player(100, SCREEN_HEIGHT - 150)
     
-    # Generate platforms and stars
+    # Generate platforms and stars, indexed so each frame only visits those near the player or in view
     platforms = generate_platforms()
-    stars = generate_stars(platforms)
+    stars = IntervalIndex(generate_stars(platforms))
+    platforms = IntervalIndex(platforms)
     
     # Game loop
     run = True
     while run:
         clock.tick(FPS)
         
-        # Draw background
-        draw_background(scroll)
-        
-        # Draw platforms
-        for platform in platforms:
-            platform.draw()
-        
-        # Draw stars
-        for star in stars:
-            star.draw()
-        
-        # Draw player
-        player.draw()
-        
-        # Draw score
-        draw_text(f'Score: {score}', font, BLACK, 20, 20)
-        
-        # Check for star collection
-        for star in stars:
-            if not star.collected and player.rect.colliderect(star.rect):
-                star.collected = True
-                score += 1
-        
-        # Update player and scroll
-        scroll_change = player.move(platforms)
-        scroll += scroll_change
-        bg_scroll += scroll_change
-        
-        # Handle scrolling
-        if player.rect.right > SCREEN_WIDTH - SCROLL_THRESH and player.direction > 0:
-            scroll += player.speed
-        
-        # Check for game end (player falls off screen)
-        if player.rect.top > SCREEN_HEIGHT:
+        # Draw, collect stars, move and scroll
+        if not step_frame(player, platforms, stars):
             run = False
         
         # Event handler
@@ -1,8 +1,13 @@
 import pygame, sys
-from tiles import Tile, Flag
+from bisect import bisect_left, bisect_right
+from tiles import Tile, Flag, merge_terrain
 from player import Player
 from settings import *
 
+def cell_edge(origin, position):
+    """Left edge of the TILE_SIZE cell containing position, in a run of cells starting at origin"""
+    return origin + max(position - origin, 0) // TILE_SIZE * TILE_SIZE
+
 class Level:
     def __init__(self, level_data, surface):
         self.display_surface = surface
@@ -12,11 +17,31 @@ class Level:
         self.current_x = 0
         self.game_won = False
         
+        # Camera offset: sprites stay in world coordinates and are drawn at rect + offset
+        self.offset_x = 0
+        self.offset_y = 0
+        
         # Calculate level height for vertical scrolling
         self.level_height = len(level_data) * TILE_SIZE
         
+        # Spawn position, so retry can put the player back instead of rebuilding the level
+        self.player_origin = self.player.sprite.rect.topleft
+    
+    def reset(self):
+        """Put the player back where it spawned and clear the camera and game state, keeping the sprites"""
+        self.player.sprite.rect.topleft = self.player_origin
+        self.player.sprite.reset()
+        self.world_shift_x = 0
+        self.world_shift_y = 0
+        self.offset_x = 0
+        self.offset_y = 0
+        self.current_x = 0
+        self.game_won = False
+    
     def setup_level(self, layout):
         self.tiles = pygame.sprite.Group()
+        self.tile_columns = {}  # Column index -> tiles top to bottom, so drawing only visits the columns in view
+        self.column_tops = {}   # Column index -> y of those tiles, for bisecting to the rows in view
         self.player = pygame.sprite.GroupSingle()
         self.flag = pygame.sprite.GroupSingle()
         
@@ -28,17 +53,69 @@ class Level:
                 if cell == 'X':
                     tile = Tile((x, y), TILE_SIZE)
                     self.tiles.add(tile)
+                    self.tile_columns.setdefault(col_index, []).append(tile)
+                    self.column_tops.setdefault(col_index, []).append(y)
                 elif cell == 'P':
                     player_sprite = Player((x, y))
                     self.player.add(player_sprite)
                 elif cell == 'F':
                     flag_sprite = Flag((x, y), TILE_SIZE)
                     self.flag.add(flag_sprite)
+        
+        # Collision runs against merged runs of terrain, not tile by tile, looked up by row
+        self.colliders = merge_terrain(layout, TILE_SIZE)
+        self.collider_rows = {}    # Row index -> runs in that row, left to right
+        self.collider_rights = {}  # Row index -> right edges of those runs, for bisecting
+        for collider in self.colliders:
+            row = collider.y // TILE_SIZE
+            self.collider_rows.setdefault(row, []).append(collider)
+            self.collider_rights.setdefault(row, []).append(collider.right)
+    
+    def to_screen(self, rect):
+        """Screen position of a rect in world coordinates"""
+        return rect.move(self.offset_x, self.offset_y)
+    
+    def move_camera(self):
+        """Apply the scroll chosen last frame to the camera offset.
+        
+        The player keeps its place on screen while the view scrolls, as when the
+        world itself was shifted, so it is carried by the same amount in the world.
+        """
+        self.offset_x += self.world_shift_x
+        self.offset_y += self.world_shift_y
+        player = self.player.sprite
+        player.rect.x -= self.world_shift_x
+        player.rect.y -= self.world_shift_y
+    
+    def draw_tiles(self):
+        """Blit the tiles in view only.
+        
+        Each column in view is bisected to its rows in view, so the cost doesn't
+        grow with the level's width or height.
+        """
+        first_col = -self.offset_x // TILE_SIZE
+        last_col = (SCREEN_WIDTH - self.offset_x) // TILE_SIZE
+        top = -self.offset_y - TILE_SIZE
+        bottom = SCREEN_HEIGHT - self.offset_y
+        
+        blits = []
+        for col_index in range(first_col, last_col + 1):
+            tiles = self.tile_columns.get(col_index)
+            if tiles:
+                tops = self.column_tops[col_index]
+                start = bisect_right(tops, top)
+                end = bisect_left(tops, bottom)
+                blits.extend((tile.image, self.to_screen(tile.rect)) for tile in tiles[start:end])
+        self.display_surface.blits(blits, doreturn=False)
+    
+    def draw_sprites(self, group):
+        for sprite in group:
+            self.display_surface.blit(sprite.image, self.to_screen(sprite.rect))
     
     def scroll_camera(self):
         player = self.player.sprite
-        player_x = player.rect.centerx
-        player_y = player.rect.centery
+        player_x = player.rect.centerx + self.offset_x
+        player_y = player.rect.centery + self.offset_y
         direction_x = player.direction.x
         
         # Horizontal scrolling
@@ -48,7 +125,7 @@ class Level:
             self.world_shift_x = -8
         else:
             self.world_shift_x = 0
-            
+        
         # Vertical scrolling - follow player vertically
         if player_y < SCREEN_HEIGHT / 3:
             self.world_shift_y = 8  # Scroll down (objects move down)
@@ -57,18 +134,37 @@ class Level:
         else:
             self.world_shift_y = 0
     
+    def colliders_near(self, player):
+        """Terrain runs overlapping the player's span, in the row-major order collision resolves in.
+        
+        Each row is bisected to the first run ending past the player's left edge.
+        The player's rect is re-read after every run, so a push into a run or row
+        the player didn't reach before still tests it, as the full scan did.
+        """
+        row = player.rect.top // TILE_SIZE
+        while row <= (player.rect.bottom - 1) // TILE_SIZE:
+            runs = self.collider_rows.get(row)
+            if runs:
+                index = bisect_right(self.collider_rights[row], player.rect.left)
+                while index < len(runs) and runs[index].left < player.rect.right:
+                    yield runs[index]
+                    index += 1
+            row += 1
+    
     def horizontal_movement_collision(self):
         player = self.player.sprite
         player.rect.x += player.direction.x * player.speed
         
-        for sprite in self.tiles.sprites():
-            if sprite.rect.colliderect(player.rect):
+        # A hit moving left pushes past the whole run, where tile by tile would have cascaded to;
+        # moving right it stops at the first tile of the run the player overlaps
+        for collider in self.colliders_near(player):
+            if collider.colliderect(player.rect):
                 if player.direction.x < 0: 
-                    player.rect.left = sprite.rect.right
+                    player.rect.left = collider.right
                     player.on_left = True
                     self.current_x = player.rect.left
                 elif player.direction.x > 0:
-                    player.rect.right = sprite.rect.left
+                    player.rect.right = cell_edge(collider.left, player.rect.left)
                     player.on_right = True
                     self.current_x = player.rect.right
         
@@ -81,14 +177,14 @@ class Level:
         player = self.player.sprite
         player.apply_gravity()
         
-        for sprite in self.tiles.sprites():
-            if sprite.rect.colliderect(player.rect):
+        for collider in self.colliders_near(player):
+            if collider.colliderect(player.rect):
                 if player.direction.y > 0: 
-                    player.rect.bottom = sprite.rect.top
+                    player.rect.bottom = collider.top
                     player.direction.y = 0
                     player.on_ground = True
                 elif player.direction.y < 0:
-                    player.rect.top = sprite.rect.bottom
+                    player.rect.top = collider.bottom
                     player.direction.y = 0
                     player.on_ceiling = True
         
@@ -103,6 +199,10 @@ class Level:
         if pygame.sprite.spritecollide(player, self.flag, False) and not self.game_won:
             self.game_won = True
             
+            # The camera stops with the game, so the static win screen isn't redrawn as scrolling
+            self.world_shift_x = 0
+            self.world_shift_y = 0
+            
             # Format time as minutes:seconds.milliseconds
             minutes = int(elapsed_time / 60000)
             seconds = int((elapsed_time % 60000) / 1000)
@@ -167,19 +267,20 @@ class Level:
             self.display_surface.blit(time_text, time_rect)
             return
         
+        # Camera
+        self.move_camera()
+        
         # Level tiles
-        self.tiles.update(self.world_shift_x, self.world_shift_y)
-        self.tiles.draw(self.display_surface)
+        self.draw_tiles()
         
         # Flag
-        self.flag.update(self.world_shift_x, self.world_shift_y)
-        self.flag.draw(self.display_surface)
+        self.draw_sprites(self.flag)
         
         # Player
         self.player.update()
         self.horizontal_movement_collision()
         self.vertical_movement_collision()
-        self.player.draw(self.display_surface)
+        self.draw_sprites(self.player)
         self.scroll_camera()
         
         # Check for win condition
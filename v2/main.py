@@ -31,6 +31,12 @@ async def main():
     elapsed_time = 0
     game_started = False
     
+    # Dirty-rect presentation: while the world isn't scrolling only the regions that
+    # changed (plus last frame's, to clear them) are sent to the display
+    full_redraw = True
+    previous_rects = []
+    was_won = False
+    
     running = True
     while running:
         # Update elapsed time only if game has started and not won
@@ -46,8 +52,9 @@ async def main():
             if event.type == pygame.MOUSEBUTTONDOWN:
                 # Retry button
                 if retry_button_bg.collidepoint(event.pos):
-                    # Restart the game by creating a new level and resetting timer
-                    level = Level(level_map, screen)
+                    # Restart the game by resetting the level in place and resetting timer
+                    level.reset()
+                    full_redraw = True
                     if game_started:
                         start_time = pygame.time.get_ticks()
                     else:
@@ -57,20 +64,31 @@ async def main():
                 if start_button_bg.collidepoint(event.pos) and not game_started:
                     game_started = True
                     start_time = pygame.time.get_ticks()
+                    full_redraw = True
         
         # STEP 1: Clear screen with sky blue background - MUST BE FIRST
         screen.fill('skyblue')
         
         # STEP 2: Run game logic and draw elements
+        # Tiles only move on screen when the camera scroll applied this frame is non-zero
+        if level.world_shift_x or level.world_shift_y:
+            full_redraw = True
+        old_player_rect = level.to_screen(level.player.sprite.rect)
         level.run(elapsed_time)
         
+        # Winning draws the overlay during run, so present it on the same frame
+        if level.game_won != was_won:
+            full_redraw = True
+        was_won = level.game_won
+        player_rect = level.to_screen(level.player.sprite.rect)
+        dirty_rects = [old_player_rect.inflate(8, 8), player_rect.inflate(8, 8)]
+        
         # STEP 3: Draw player highlight if game is not won
-        player = level.player.sprite
         if not level.game_won:
             # Draw a white highlight around the player to make it more visible
             pygame.draw.rect(screen, (255, 255, 255), 
-                            (player.rect.x - 3, player.rect.y - 3, 
-                             player.rect.width + 6, player.rect.height + 6), 3)
+                            (player_rect.x - 3, player_rect.y - 3, 
+                             player_rect.width + 6, player_rect.height + 6), 3)
         
         # Draw retry button
         pygame.draw.rect(screen, (50, 50, 200), retry_button_bg, border_radius=5)
@@ -93,10 +111,15 @@ async def main():
             time_str = "Time: 00:00.00"
         
         time_surf = button_font.render(time_str, True, (0, 0, 0))
-        screen.blit(time_surf, (SCREEN_WIDTH - 200, 10))
+        dirty_rects.append(screen.blit(time_surf, (SCREEN_WIDTH - 200, 10)))
         
         # STEP 4: Update display
-        pygame.display.flip()
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects + previous_rects)
+        previous_rects = dirty_rects
+        full_redraw = False
         
         # Maintain 60 FPS and yield to browser
         clock.tick(60)
@@ -25,6 +25,16 @@ class Player(pygame.sprite.Sprite):
         self.on_left = False
         self.on_right = False
     
+    def reset(self):
+        """Clear movement and status, leaving the position to the level"""
+        self.direction.update(0, 0)
+        self.status = 'idle'
+        self.facing_right = True
+        self.on_ground = False
+        self.on_ceiling = False
+        self.on_left = False
+        self.on_right = False
+    
     def get_input(self):
         keys = pygame.key.get_pressed()
         
@@ -36,7 +46,7 @@ class Player(pygame.sprite.Sprite):
             self.facing_right = False
         else:
             self.direction.x = 0
-            
+        
         if keys[pygame.K_SPACE] and self.on_ground:
             self.jump()
     
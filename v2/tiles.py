@@ -9,10 +9,23 @@ class Tile(pygame.sprite.Sprite):
         # Add a black border to make tiles more visible
         pygame.draw.rect(self.image, (0, 0, 0), (0, 0, size, size), 2)
         self.rect = self.image.get_rect(topleft = pos)
+
+def merge_terrain(layout, size):
+    """Merge each horizontal run of 'X' cells in a layout into one rectangle.
     
-    def update(self, x_shift, y_shift):
-        self.rect.x += x_shift
-        self.rect.y += y_shift
+    Runs are returned row by row, left to right: the same order the tiles were
+    tested in, which collision relies on to resolve exactly as tile by tile.
+    """
+    rects = []
+    for row_index, row in enumerate(layout):
+        col_index = row.find('X')
+        while col_index >= 0:
+            end = col_index
+            while end < len(row) and row[end] == 'X':
+                end += 1
+            rects.append(pygame.Rect(col_index * size, row_index * size, (end - col_index) * size, size))
+            col_index = row.find('X', end)
+    return rects
 
 class Flag(pygame.sprite.Sprite):
     def __init__(self, pos, size):
@@ -22,7 +35,3 @@ class Flag(pygame.sprite.Sprite):
         # Add a black border to make flag more visible
         pygame.draw.rect(self.image, (0, 0, 0), (0, 0, size // 2, size), 2)
         self.rect = self.image.get_rect(topleft = pos)
-    
-    def update(self, x_shift, y_shift):
-        self.rect.x += x_shift
-        self.rect.y += y_shift
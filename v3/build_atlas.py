@@ -0,0 +1,85 @@
+"""Offline texture atlas builder.
+
+Packs every top-level folder under graphics/ into one sheet plus a JSON index:
+
+    graphics/atlas/<folder>.png
+    graphics/atlas/<folder>.json
+
+support.py serves images from these sheets when they exist and falls back to the
+individual files when they don't. Re-run after adding or changing graphics:
+
+    python build_atlas.py
+"""
+import json
+import os
+import pygame
+
+GRAPHICS_DIR = 'graphics'
+ATLAS_DIR = 'graphics/atlas'
+MAX_SHEET_WIDTH = 2048
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+def collect_folders(root):
+    """Map every folder under root to its image paths, in the order import_folder walks them"""
+    folders = {}
+    for folder_name, sub_folders, img_files in os.walk(root):
+        folder = folder_name.replace(os.sep, '/')
+        images = [folder + '/' + name for name in img_files if name.endswith(IMAGE_EXTENSIONS)]
+        if images:
+            folders[folder] = images
+    return folders
+
+def pack_shelves(sizes, max_width=MAX_SHEET_WIDTH):
+    """Shelf-pack (width, height) boxes, tallest first.
+    
+    Returns the top-left position of each box (in input order) and the sheet size.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = sheet_width = 0
+    
+    for i in order:
+        width, height = sizes[i]
+        if x and x + width > max_width:
+            # Start a new shelf below the current one
+            y += shelf_height
+            x = shelf_height = 0
+        positions[i] = (x, y)
+        x += width
+        shelf_height = max(shelf_height, height)
+        sheet_width = max(sheet_width, x)
+    
+    return positions, (sheet_width, y + shelf_height)
+
+def build_atlas(name, folders):
+    """Pack the images of the given folders into one sheet and write it with its index"""
+    paths = [path for images in folders.values() for path in images]
+    images = [pygame.image.load(path) for path in paths]
+    positions, sheet_size = pack_shelves([image.get_size() for image in images])
+    
+    sheet = pygame.Surface(sheet_size, pygame.SRCALPHA)
+    frames = {}
+    for path, image, pos in zip(paths, images, positions):
+        sheet.blit(image, pos)
+        frames[path] = [pos[0], pos[1], image.get_width(), image.get_height()]
+    
+    sheet_path = f'{ATLAS_DIR}/{name}.png'
+    pygame.image.save(sheet, sheet_path)
+    with open(f'{ATLAS_DIR}/{name}.json', 'w') as index_file:
+        json.dump({'image': sheet_path, 'folders': folders, 'frames': frames}, index_file, indent=1)
+    
+    return sheet_size, len(paths)
+
+def main():
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    for name in sorted(os.listdir(GRAPHICS_DIR)):
+        root = f'{GRAPHICS_DIR}/{name}'
+        if not os.path.isdir(root) or root == ATLAS_DIR:
+            continue
+        folders = collect_folders(root)
+        if folders:
+            (width, height), count = build_atlas(name, folders)
+            print(f'{name}: {count} images -> {width}x{height}')
+
+if __name__ == '__main__':
+    main()
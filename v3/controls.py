@@ -0,0 +1,16 @@
+import pygame
+from collections import namedtuple
+
+# One tick of player input, decoupled from where it came from (keyboard, script, replay).
+# start/retry are the START and RETRY button clicks landing on this tick; rewind
+# steps back one tick instead of simulating it.
+InputState = namedtuple('InputState', ['left', 'right', 'jump', 'start', 'retry', 'rewind'],
+                        defaults=(False, False, False, False, False, False))
+
+NO_INPUT = InputState()
+
+def read_keyboard():
+    """Sample the keyboard into an InputState"""
+    keys = pygame.key.get_pressed()
+    return InputState(left=keys[pygame.K_LEFT], right=keys[pygame.K_RIGHT], jump=keys[pygame.K_SPACE],
+                      rewind=keys[pygame.K_r])
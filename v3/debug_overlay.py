@@ -0,0 +1,175 @@
+import time
+import pygame
+from collections import deque
+
+# Timed phases, in the order they run within a frame
+OVERLAY_PHASES = ('update', 'scheduled', 'collide_x', 'collide_y', 'coins', 'draw', 'hud')
+
+# Level methods timed while the overlay is on: attribute path -> phase
+LEVEL_PROBES = {
+    ('active_sprites', 'update'): 'update',
+    ('scheduler', 'update'): 'scheduled',
+    ('', 'horizontal_movement_collision'): 'collide_x',
+    ('', 'vertical_movement_collision'): 'collide_y',
+    ('', 'check_coin_collision'): 'coins',
+    ('visible_sprites', 'custom_draw'): 'draw',
+}
+
+HISTORY_FRAMES = 120
+PANEL_COLOR = (0, 0, 0, 170)
+BUDGET_MS = 1000 / 60
+COLLIDER_COLOR = (255, 0, 255)
+
+class DebugOverlay:
+    """F3 performance overlay: frame time history, per-phase timings and work counters.
+    
+    Instrumentation is installed by shadowing the level's methods with timed
+    wrappers while the overlay is on and removed again when it is switched off,
+    so a disabled overlay adds no work to the frame at all.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.level = None
+        self.font = None
+        
+        # Accumulators for the frame in progress
+        self.phase_seconds = dict.fromkeys(OVERLAY_PHASES, 0.0)
+        self.counters = {'updated': 0, 'blits': 0, 'tests': 0}
+        self.frame_started = 0.0
+        self.phase_started = 0.0
+        
+        # Finished frames
+        self.frame_times = deque(maxlen=HISTORY_FRAMES)
+        self.last_phases = dict(self.phase_seconds)
+        self.last_counters = dict(self.counters)
+    
+    def toggle(self, level):
+        """Switch the overlay on or off for the given level"""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.frame_times.clear()
+            self.attach(level)
+        else:
+            self.detach()
+    
+    def attach(self, level):
+        """Instrument a (new) level; does nothing while the overlay is off"""
+        self.detach()
+        if not self.enabled:
+            return
+        self.level = level
+        for (owner_name, method_name), phase in LEVEL_PROBES.items():
+            owner = getattr(level, owner_name) if owner_name else level
+            setattr(owner, method_name, self.timed(phase, getattr(owner, method_name)))
+    
+    def detach(self):
+        """Remove the timed wrappers so the level runs its plain methods again"""
+        if self.level is None:
+            return
+        for owner_name, method_name in LEVEL_PROBES:
+            owner = getattr(self.level, owner_name) if owner_name else self.level
+            owner.__dict__.pop(method_name, None)
+        self.level = None
+    
+    def timed(self, phase, method):
+        """Wrap a bound method so its time and work are added to the current frame"""
+        seconds = self.phase_seconds
+        counters = self.counters
+        level = self.level
+        clock = time.perf_counter
+        
+        def probe(*args, **kwargs):
+            # Work counters are read from state the method is about to touch
+            if phase == 'update':
+                counters['updated'] += len(level.active_sprites)
+            elif phase in ('collide_x', 'collide_y'):
+                counters['tests'] += len(level.tilemap.colliders_in(level.player.sprite.rect))
+            elif phase == 'coins':
+                counters['tests'] += len(level.coin_sprites)
+            
+            started = clock()
+            result = method(*args, **kwargs)
+            seconds[phase] += clock() - started
+            
+            if phase == 'scheduled':
+                counters['updated'] += level.scheduler.updated
+            elif phase == 'draw':
+                counters['blits'] += level.visible_sprites.sprites_drawn
+            return result
+        return probe
+    
+    def begin_frame(self):
+        """Start accumulating a new frame"""
+        if not self.enabled:
+            return
+        for phase in self.phase_seconds:
+            self.phase_seconds[phase] = 0.0
+        for name in self.counters:
+            self.counters[name] = 0
+        self.frame_started = time.perf_counter()
+    
+    def end_frame(self):
+        """Close the frame: its work time (excluding the vsync wait) joins the history"""
+        if not self.enabled:
+            return
+        self.frame_times.append(time.perf_counter() - self.frame_started)
+        self.last_phases = dict(self.phase_seconds)
+        self.last_counters = dict(self.counters)
+    
+    def start_phase(self, phase):
+        """Mark the start of an inline phase (code that isn't a level method, like the HUD)"""
+        if self.enabled:
+            self.phase_started = time.perf_counter()
+    
+    def stop_phase(self, phase):
+        """Mark the end of an inline phase started with start_phase"""
+        if self.enabled:
+            self.phase_seconds[phase] += time.perf_counter() - self.phase_started
+    
+    def draw(self, surface, fps):
+        """Draw collider outlines and the overlay panel in the bottom-left corner, and return the screen rect they cover"""
+        if not self.enabled:
+            return
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        
+        # Terrain colliders in view, outlined over the level
+        outlines = []
+        if self.level:
+            camera = self.level.visible_sprites
+            # The interpolated offset the level was just drawn with, when the camera tracks it
+            offset_x, offset_y = camera.drawn_offset or (round(camera.offset.x), round(camera.offset.y))
+            view = (offset_x, offset_y, *surface.get_size())
+            for x, y, w, h in self.level.tilemap.colliders_in(view):
+                outlines.append(pygame.draw.rect(surface, COLLIDER_COLOR, (x - offset_x, y - offset_y, w, h), 1))
+        
+        panel = pygame.Surface((320, 236), pygame.SRCALPHA)
+        panel.fill(PANEL_COLOR)
+        
+        # Frame time summary
+        times = self.frame_times
+        latest = times[-1] * 1000 if times else 0.0
+        average = sum(times) / len(times) * 1000 if times else 0.0
+        worst = max(times) * 1000 if times else 0.0
+        lines = [f'frame {latest:5.2f} ms  avg {average:5.2f}  max {worst:5.2f}  {fps:4.0f} fps']
+        
+        # Per-phase breakdown of the last frame
+        for phase in OVERLAY_PHASES:
+            lines.append(f'{phase:<10} {self.last_phases[phase] * 1000:6.3f} ms')
+        counters = self.last_counters
+        lines.append(f"updated {counters['updated']}  blits {counters['blits']}  tests {counters['tests']}")
+        
+        for i, line in enumerate(lines):
+            panel.blit(self.font.render(line, True, (255, 255, 255)), (8, 6 + i * 16))
+        
+        # Rolling histogram: one bar per frame, the line marks the 60 fps budget
+        graph = pygame.Rect(8, 176, HISTORY_FRAMES * 2, 52)
+        budget_y = graph.bottom - graph.height // 2
+        for i, seconds in enumerate(times):
+            ms = seconds * 1000
+            height = min(int(ms / BUDGET_MS * graph.height / 2), graph.height)
+            color = (90, 220, 90) if ms <= BUDGET_MS else (230, 80, 60)
+            pygame.draw.rect(panel, color, (graph.left + i * 2, graph.bottom - height, 2, height))
+        pygame.draw.line(panel, (255, 255, 0), (graph.left, budget_y), (graph.right, budget_y))
+        
+        return surface.blit(panel, (10, surface.get_height() - panel.get_height() - 10)).unionall(outlines)
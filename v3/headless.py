@@ -0,0 +1,184 @@
+"""Headless v3 simulation runner for level QA and physics regression checks.
+
+Steps Level.step at a fixed dt with injected input and no window, as fast as
+the CPU allows:
+
+    python headless.py --runs 1000 --ticks 1800 --seed 1
+    python headless.py --record run.rpl --ticks 3600
+    python headless.py --replay run.rpl
+    python headless.py --level levels/big.plvl
+    python headless.py --check-rewind --ticks 3600
+
+Each run prints nothing; the summary reports wins, coins, falls and a checksum
+of every player position, which changes if the physics change. --record saves
+the first run as a replay log; --replay plays a log (recorded here or in the
+game) and checks that it reproduces the recorded positions. --check-rewind plays a
+run with rewind held every few seconds and checks both that it ends where the
+same run without the undone ticks ends and that its log replays exactly.
+"""
+import os
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import argparse
+import itertools
+import random
+import struct
+import tempfile
+import time
+import zlib
+from settings import level_map, TILE_SIZE
+from level import Level
+from controls import InputState
+from replay import InputRecorder, InputReplay, track_position
+from levelfile import LevelFile
+from rewind import RewindBuffer
+
+def random_inputs(seed, hold_ticks=15):
+    """Endless stream of random InputStates, each held for a few ticks"""
+    rng = random.Random(seed)
+    while True:
+        choice = rng.random()
+        state = InputState(left=0.6 <= choice < 0.8, right=choice < 0.6, jump=rng.random() < 0.4)
+        for _ in range(hold_ticks):
+            yield state
+
+def rewind_inputs(seed, rewind_every=120, rewind_ticks=30):
+    """random_inputs with rewind also held for the last rewind_ticks of every rewind_every ticks"""
+    for tick, state in enumerate(random_inputs(seed)):
+        yield state._replace(rewind=tick % rewind_every >= rewind_every - rewind_ticks)
+
+def without_rewinds(inputs):
+    """The inputs left once every rewind tick has undone the latest stepped tick"""
+    kept = []
+    for state in inputs:
+        if not state.rewind:
+            kept.append(state)
+        elif kept:
+            kept.pop()
+    return kept
+
+def run_playthrough(layout, inputs, ticks, dt=1/60, recorder=None, stop_early=True, rewindable=False):
+    """Simulate one playthrough and return its outcome.
+    
+    Stops early when the player wins or falls below the level, unless stop_early is off.
+    rewindable keeps the per-tick snapshots that rewind input needs (replays of the game use it).
+    """
+    level = Level(layout)
+    rewind = RewindBuffer(level) if rewindable else None
+    player = level.player.sprite
+    floor = level.tilemap.height * TILE_SIZE
+    checksum = 0
+    tick = 0
+    
+    for tick, state in enumerate(inputs, 1):
+        if state.retry:
+            level.reset()
+            if rewind is not None:
+                rewind.clear()
+        # RewindBuffer is falsy while empty, so test for it explicitly
+        if rewind is not None and state.rewind:
+            rewind.rewind()
+        else:
+            if rewind is not None:
+                rewind.capture()
+            level.step(dt, state)
+        checksum = track_position(checksum, player.rect)
+        if recorder:
+            recorder.record(state)
+            recorder.track(player.rect)
+        if tick >= ticks or (stop_early and (level.game_won or player.rect.top > floor)):
+            break
+    
+    return {
+        'ticks': tick,
+        'won': level.game_won,
+        'fell': player.rect.top > floor,
+        'coins': level.coins_collected,
+        'position': player.rect.topleft,
+        'checksum': checksum,
+    }
+
+def check_rewind(layout, seed, ticks, dt=1/60):
+    """Regression check for rewind; returns a list of failures, empty if it passed.
+    
+    A run with rewind ticks has to end where the same run with the undone ticks
+    cut out ends, and its replay log has to reproduce its positions.
+    """
+    failures = []
+    inputs = list(itertools.islice(rewind_inputs(seed), ticks))
+    
+    random.seed(seed)
+    recorder = InputRecorder(layout, seed)
+    rewound = run_playthrough(layout, iter(inputs), ticks, dt, recorder, stop_early=False, rewindable=True)
+    
+    kept = without_rewinds(inputs)
+    random.seed(seed)
+    straight = run_playthrough(layout, iter(kept), len(kept), dt, stop_early=False)
+    for key in ('position', 'coins', 'won'):
+        if rewound[key] != straight[key]:
+            failures.append(f'{key} {rewound[key]} after rewinding, {straight[key]} without the undone ticks')
+    
+    with tempfile.TemporaryDirectory() as folder:
+        log_path = os.path.join(folder, 'rewind.rpl')
+        recorder.save(log_path)
+        replay = InputReplay(log_path, layout)
+    replay.seed_random()
+    result = run_playthrough(layout, iter(replay.next_inputs, None), len(replay.ticks), dt,
+                             stop_early=False, rewindable=True)
+    replay.checksum = result['checksum']
+    if not replay.matches():
+        failures.append('replay log DESYNC')
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Run headless v3 playthroughs with random input')
+    parser.add_argument('--runs', type=int, default=100)
+    parser.add_argument('--ticks', type=int, default=1800, help='maximum ticks per run')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first run')
+    parser.add_argument('--dt', type=float, default=1/60)
+    parser.add_argument('--record', metavar='PATH', help='save the first run as a replay log')
+    parser.add_argument('--replay', metavar='PATH', help='replay a log and verify its positions')
+    parser.add_argument('--level', metavar='PATH', help='level file to play (default: settings.level_map)')
+    parser.add_argument('--check-rewind', action='store_true',
+                        help='check that rewinding undoes ticks exactly and replays from a log')
+    args = parser.parse_args()
+    layout = LevelFile(args.level) if args.level else level_map
+    
+    if args.check_rewind:
+        failures = check_rewind(layout, args.seed, args.ticks, args.dt)
+        print('rewind check:', '; '.join(failures) if failures else 'ok')
+        if failures:
+            raise SystemExit(1)
+        return
+    
+    if args.replay:
+        replay = InputReplay(args.replay, layout)
+        replay.seed_random()
+        inputs = iter(replay.next_inputs, None)
+        result = run_playthrough(layout, inputs, len(replay.ticks), args.dt, stop_early=False, rewindable=True)
+        replay.checksum = result['checksum']
+        print(f"replayed {result['ticks']} ticks, final position {result['position']}: "
+              f"{'positions match' if replay.matches() else 'DESYNC'}")
+        return
+    
+    started = time.perf_counter()
+    recorder = InputRecorder(layout, args.seed) if args.record else None
+    results = [run_playthrough(layout, random_inputs(args.seed + run), args.ticks, args.dt,
+                               recorder if run == 0 else None)
+               for run in range(args.runs)]
+    if recorder:
+        recorder.save(args.record)
+    elapsed = time.perf_counter() - started
+    
+    total_ticks = sum(result['ticks'] for result in results)
+    checksum = 0
+    for result in results:
+        checksum = zlib.crc32(struct.pack('<I', result['checksum']), checksum)
+    
+    print(f"{args.runs} runs, {total_ticks} ticks in {elapsed:.2f} s "
+          f"({args.runs / elapsed * 60:.0f} runs/min, {total_ticks / elapsed:.0f} ticks/s)")
+    print(f"won {sum(r['won'] for r in results)}, fell {sum(r['fell'] for r in results)}, "
+          f"coins {sum(r['coins'] for r in results)}, checksum {checksum:08x}")
+
+if __name__ == '__main__':
+    main()
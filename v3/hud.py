@@ -0,0 +1,64 @@
+import pygame
+
+# 1px outline offsets around text, relative to the text's own position
+OUTLINE_OFFSETS = ((1, 0), (-1, 0), (0, -1), (0, 1))
+
+class TextCache:
+    """Rendered text surfaces keyed on (font, text, colour).
+    
+    Text is rendered the first time a value is seen and reused after that, so a
+    HUD that redraws every frame only pays for rendering when a value changes.
+    Fast-changing strings like the stopwatch are composed from cached glyphs
+    instead, so they don't fill the cache with one entry per value.
+    """
+    def __init__(self):
+        self.fonts = {}
+        self.surfaces = {}
+        self.renders = 0
+    
+    def font(self, name, size):
+        """Shared Font object for a font file (None = default font) and size"""
+        key = (name, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.Font(name, size)
+        return self.fonts[key]
+    
+    def render(self, font, text, color):
+        """Antialiased text surface, rendered once per (font, text, colour)"""
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            self.renders += 1
+        return surface
+    
+    def outlined(self, font, text, color, outline_color):
+        """Text with a 1px outline baked into one surface.
+        
+        The surface has a 1px margin, so blit it one pixel up and left of where
+        the text itself should sit.
+        """
+        key = (font, text, color, outline_color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            fill = self.render(font, text, color)
+            outline = self.render(font, text, outline_color)
+            surface = pygame.Surface((fill.get_width() + 2, fill.get_height() + 2), pygame.SRCALPHA)
+            for dx, dy in OUTLINE_OFFSETS:
+                surface.blit(outline, (1 + dx, 1 + dy))
+            surface.blit(fill, (1, 1))
+            self.surfaces[key] = surface
+        return surface
+    
+    def draw_glyphs(self, surface, font, text, color, pos):
+        """Draw text one cached glyph at a time, for strings whose value changes every frame"""
+        x, y = pos
+        for char in text:
+            glyph = self.render(font, char, color)
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(pos[0], y, x - pos[0], font.get_linesize())
+
+# Process-wide cache shared by the main loop and the level
+text_cache = TextCache()
@@ -1,76 +1,315 @@
 import pygame
 from settings import *
-from tiles import TerrainTile, PalmFlag, Coin, Cloud, load_terrain_graphics
+from tiles import TerrainTile, PalmFlag, Coin, Cloud, load_terrain_graphics, bake_terrain_chunks
 from player import Player
+from tilemap import TileMap, autotile_key
+from render import RenderLayer
+from hud import text_cache
+from animation import AnimationClock
+from scheduler import UpdateScheduler
+from streaming import ChunkStreamer
+from levelfile import LevelFile
 import random
 
+def coin_cell(coin):
+    """Cell of a coin sprite (coins are centred in their cell)"""
+    return (coin.rect.centerx // TILE_SIZE, coin.rect.centery // TILE_SIZE)
+
 class Level:
-    def __init__(self, level_data, surface):
-        # Level setup
+    def __init__(self, level_data, surface=None):
+        # Level setup from a string map or a LevelFile; without a surface the level runs headless (simulation only)
         self.display_surface = surface
+        self.headless = surface is None
         self.world_shift = 0
         
         # Load graphics
         self.terrain_graphics = load_terrain_graphics()
         
+        # One clock drives every animation type, instead of a frame counter per sprite
+        self.animations = AnimationClock()
+        
+        # Neighbour mask -> autotile name, resolved once against the loaded tile set
+        self.autotile_table = [autotile_key(mask, self.terrain_graphics) for mask in range(256)]
+        
         # Sprite groups
-        self.visible_sprites = CameraGroup()
-        self.active_sprites = pygame.sprite.Group()
+        self.visible_sprites = CameraGroup(surface)
+        self.active_sprites = pygame.sprite.Group()  # Updated every tick (the player)
+        # Scenery updated at a rate set by its distance from the camera
+        self.scheduler = UpdateScheduler(UPDATE_NEAR_MARGIN, UPDATE_NEAR_INTERVAL, self.visible_sprites.sprite_moved)
         self.collision_sprites = pygame.sprite.Group()
         self.coin_sprites = pygame.sprite.Group()
         self.cloud_sprites = pygame.sprite.Group()  # Background clouds
+        self.coin_probe = pygame.sprite.Sprite()  # Stand-in for the player in coin pickups
+        
+        # Streamed content: what each chunk holds, and the sprites of the loaded ones
+        self.chunk_objects = {}   # chunk key -> [(kind, data)] coins and clouds to create on load
+        self.chunk_sprites = {}   # loaded chunk key -> coin and cloud sprites created for it
+        self.terrain_tiles = {}   # (col, row) -> terrain tile, loaded chunks only
+        self.terrain_chunks = {}  # chunk key -> baked terrain, loaded chunks only
         
         # Game state
         self.game_won = False
         self.coins_collected = 0
         self.total_coins = 0
+        self.coin_cells = []  # Every coin's cell; a coin's index here is its bit in coin_bits
+        self.coin_index = {}  # Coin cell -> index in coin_cells
+        self.coin_bits = 0    # One bit per picked-up coin, so coins stay gone when their chunk reloads
         
         # Setup level
-        self.setup_level(level_data)
-        self.setup_clouds()  # Add background clouds
+        if isinstance(level_data, LevelFile):
+            self.setup_level_file(level_data)
+        else:
+            self.setup_level(level_data)
+        if not self.headless:
+            self.setup_clouds(self.tilemap.width * TILE_SIZE)  # Add background clouds
+        
+        # Only the chunks around the camera have sprites; the rest exist as map data
+        self.streamer = ChunkStreamer(TERRAIN_CHUNK_TILES * TILE_SIZE, STREAM_LOAD_MARGIN,
+                                      STREAM_UNLOAD_MARGIN, self.load_chunk, self.unload_chunk)
+        self.streamer.update(self.visible_sprites.view_rect())
+        
+        # Retry returns here without rebuilding anything
+        self.initial_state = self.snapshot()
+    
+    def snapshot(self):
+        """Record the player position, pickups, win flag and camera for reset()"""
+        camera = self.visible_sprites
+        return {
+            'player': self.player.sprite.rect.topleft,
+            'coin_bits': self.coin_bits,
+            'coins_collected': self.coins_collected,
+            'game_won': self.game_won,
+            'offset': tuple(camera.offset),
+            'camera_rect': camera.camera_rect.copy(),
+        }
+    
+    def reset(self, state=None):
+        """Return the level to a snapshot (by default its initial state) in place.
+        
+        Sprites, terrain and loaded images are all kept: only picked-up coins in
+        loaded chunks are re-created, so a retry costs next to nothing.
+        """
+        state = state or self.initial_state
+        self.player.sprite.reset(state['player'])
+        self.game_won = state['game_won']
+        self.coins_collected = state['coins_collected']
+        self.animations.reset()
+        
+        self.restore_coins(state['coin_bits'])
+        
+        # Camera, with no interpolation from where it was
+        camera = self.visible_sprites
+        camera.offset.update(state['offset'])
+        camera.camera_rect = state['camera_rect'].copy()
+        camera.remember_positions()
+        self.streamer.update(camera.view_rect())
+    
+    def restore_coins(self, coin_bits):
+        """Make the coins match a picked-up bit set: drop coins it has picked up, bring back ones it hasn't"""
+        changed = self.coin_bits ^ coin_bits
+        if not changed:
+            return
+        
+        dropped = changed & coin_bits
+        if dropped:
+            for coin in self.coin_sprites.sprites():
+                if dropped >> self.coin_index[coin_cell(coin)] & 1:
+                    coin.kill()
+        
+        revived = changed & self.coin_bits
+        while revived:
+            bit = revived & -revived
+            revived ^= bit
+            cell = self.coin_cells[bit.bit_length() - 1]
+            chunk_key = (cell[0] // TERRAIN_CHUNK_TILES, cell[1] // TERRAIN_CHUNK_TILES)
+            if chunk_key in self.chunk_sprites:
+                # Unloaded chunks create theirs when they stream back in
+                self.chunk_sprites[chunk_key].append(self.add_coin(*cell))
+        
+        self.coin_bits = coin_bits
     
     def setup_level(self, layout):
         """Create the level from the layout data"""
+        # Compact solid-cell grid used for terrain collision queries and autotiling
+        # Terrain tiles are created from it when their chunk streams in
+        self.tilemap = TileMap(layout)
+        self.level_file = None
+        
         for row_index, row in enumerate(layout):
             for col_index, cell in enumerate(row):
-                x = col_index * TILE_SIZE
-                y = row_index * TILE_SIZE
-                
-                if cell == 'X':
-                    # Create terrain tile
-                    tile = TerrainTile((x, y), self.terrain_graphics)
-                    self.visible_sprites.add(tile)
-                    self.collision_sprites.add(tile)
-                
-                elif cell == 'P':
-                    # Create player
-                    self.player = pygame.sprite.GroupSingle()
-                    player_sprite = Player((x, y))
-                    self.player.add(player_sprite)
-                    self.visible_sprites.add(player_sprite)
-                    self.active_sprites.add(player_sprite)
+                if cell == 'P':
+                    self.add_player(col_index, row_index)
                 
                 elif cell == 'F':
-                    # Create palm flag (goal)
-                    palm_flag = PalmFlag((x, y))
-                    self.visible_sprites.add(palm_flag)
-                    self.active_sprites.add(palm_flag)  # Add to active sprites for animation
-                    self.goal_sprites = pygame.sprite.GroupSingle(palm_flag)
+                    self.add_goal(col_index, row_index)
                 
                 elif cell == 'C':
-                    # Create coin
-                    coin = Coin((x + TILE_SIZE//2, y + TILE_SIZE//2))  # Center coin in tile
-                    self.visible_sprites.add(coin)
-                    self.active_sprites.add(coin)  # Add to active sprites for animation
-                    self.coin_sprites.add(coin)
+                    # Record coin; the sprite is created when its chunk streams in
+                    chunk_key = (col_index // TERRAIN_CHUNK_TILES, row_index // TERRAIN_CHUNK_TILES)
+                    self.chunk_objects.setdefault(chunk_key, []).append(('coin', (col_index, row_index)))
+                    self.coin_index[(col_index, row_index)] = len(self.coin_cells)
+                    self.coin_cells.append((col_index, row_index))
                     self.total_coins += 1
     
-    def setup_clouds(self):
-        """Create background clouds for atmosphere"""
-        # Calculate level dimensions
-        level_width = len(level_map[0]) * TILE_SIZE
-        level_height = len(level_map) * TILE_SIZE
+    def add_terrain_tile(self, col, row):
+        """Create the terrain tile for a solid cell, using the autotile for its neighbours"""
+        terrain_key = self.autotile_table[self.tilemap.mask_at(col, row)]
+        tile = TerrainTile((col * TILE_SIZE, row * TILE_SIZE), self.terrain_graphics, terrain_key)
+        self.terrain_tiles[(col, row)] = tile
+        self.collision_sprites.add(tile)
+    
+    def setup_level_file(self, level_file):
+        """Create the level from a LevelFile; terrain and coins are decoded as their chunks stream in"""
+        if level_file.chunk_tiles != TERRAIN_CHUNK_TILES:
+            raise ValueError(f'{level_file.path} uses {level_file.chunk_tiles}-tile chunks, expected {TERRAIN_CHUNK_TILES}')
+        
+        # Empty map of the right size, filled in chunk by chunk
+        self.tilemap = TileMap([' ' * level_file.width] * level_file.height)
+        self.level_file = level_file
+        self.decoded_chunks = set()
+        self.total_coins = level_file.coin_count
+        self.coin_cells = level_file.coins()
+        self.coin_index = {cell: index for index, cell in enumerate(self.coin_cells)}
+        
+        if level_file.player_start:
+            col, row = level_file.player_start
+            self.add_player(col, row)
+            # The camera only catches up after the first tick, so the player needs terrain before that
+            self.decode_terrain((col // TERRAIN_CHUNK_TILES, row // TERRAIN_CHUNK_TILES))
+        if level_file.goal:
+            self.add_goal(*level_file.goal)
+    
+    def decode_terrain(self, chunk_key):
+        """Decode a chunk's terrain from the level file into the tilemap.
+        
+        The neighbouring chunks are decoded too, so the autotiles along the chunk's
+        border see their real neighbours.
+        """
+        chunk_x, chunk_y = chunk_key
+        for neighbour in [(chunk_x + dx, chunk_y + dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1)]:
+            if neighbour in self.decoded_chunks:
+                continue
+            self.decoded_chunks.add(neighbour)
+            block = self.level_file.chunk_terrain(neighbour)
+            if block:
+                self.tilemap.fill_block(*block)
+    
+    def add_player(self, col, row):
+        """Create the player at a cell"""
+        self.player = pygame.sprite.GroupSingle()
+        player_sprite = Player((col * TILE_SIZE, row * TILE_SIZE), self.animations)
+        self.player.add(player_sprite)
+        self.visible_sprites.add(player_sprite, layer='actors')
+        self.active_sprites.add(player_sprite)
+    
+    def add_goal(self, col, row):
+        """Create the palm flag (goal) at a cell"""
+        palm_flag = PalmFlag((col * TILE_SIZE, row * TILE_SIZE), self.animations)  # Animated by the shared clock
+        self.visible_sprites.add(palm_flag, layer='foreground')
+        self.goal_sprites = pygame.sprite.GroupSingle(palm_flag)
+    
+    def chunk_cells(self, chunk_key):
+        """(col, row) of every map cell inside a chunk"""
+        chunk_x, chunk_y = chunk_key
+        rows = range(max(chunk_y * TERRAIN_CHUNK_TILES, 0), min((chunk_y + 1) * TERRAIN_CHUNK_TILES, self.tilemap.height))
+        cols = range(max(chunk_x * TERRAIN_CHUNK_TILES, 0), min((chunk_x + 1) * TERRAIN_CHUNK_TILES, self.tilemap.width))
+        return [(col, row) for row in rows for col in cols]
+    
+    def load_chunk(self, chunk_key):
+        """Create the terrain, coins and clouds of a chunk that came near the camera"""
+        objects = self.chunk_objects.get(chunk_key, [])
+        if self.level_file:
+            self.decode_terrain(chunk_key)
+            objects = [('coin', cell) for cell in self.level_file.chunk_coins(chunk_key)] + objects
+        
+        if not self.headless:
+            # Collision runs on the tilemap, so headless levels never need terrain sprites
+            for col, row in self.chunk_cells(chunk_key):
+                if self.tilemap.is_solid(col, row):
+                    self.add_terrain_tile(col, row)
+            # Terrain is drawn from baked chunks, not tile by tile
+            self.rebake_chunk(chunk_key)
+        
+        sprites = []
+        for kind, data in objects:
+            if kind == 'coin':
+                if not self.coin_bits >> self.coin_index[data] & 1:
+                    sprites.append(self.add_coin(*data))
+            elif kind == 'cloud':
+                pos, cloud_type = data
+                cloud = Cloud(pos, cloud_type)
+                self.visible_sprites.add(cloud, layer='background')
+                self.scheduler.add(cloud)  # Drifts while near the camera
+                self.cloud_sprites.add(cloud)
+                sprites.append(cloud)
+        self.chunk_sprites[chunk_key] = sprites
+    
+    def add_coin(self, col, row):
+        """Create the coin at a cell"""
+        coin = Coin((col * TILE_SIZE + TILE_SIZE//2, row * TILE_SIZE + TILE_SIZE//2), self.animations)  # Center coin in tile
+        self.visible_sprites.add(coin, layer='items')  # Animated by the shared clock, no per-coin update
+        self.coin_sprites.add(coin)
+        return coin
+    
+    def unload_chunk(self, chunk_key):
+        """Release the sprites of a chunk that is far from the camera"""
+        for sprite in self.chunk_sprites.pop(chunk_key, ()):
+            self.scheduler.remove(sprite)
+            sprite.kill()
+        
+        if not self.headless:
+            for cell in self.chunk_cells(chunk_key):
+                tile = self.terrain_tiles.pop(cell, None)
+                if tile:
+                    tile.kill()
+            chunk = self.terrain_chunks.pop(chunk_key, None)
+            if chunk:
+                chunk.kill()
+    
+    def set_terrain(self, col, row, solid):
+        """Add or remove terrain at one cell.
+        
+        Only the 3x3 neighbourhood is re-autotiled, and only the chunks it touches are re-baked.
+        Unloaded chunks just keep the map change and pick it up when they stream in.
+        """
+        if self.level_file:
+            # Decode first, or the edit would be overwritten when the chunk is
+            self.decode_terrain((col // TERRAIN_CHUNK_TILES, row // TERRAIN_CHUNK_TILES))
+        changed = self.tilemap.set_solid(col, row, solid)
+        
+        dirty_chunks = set()
+        for cell in changed:
+            chunk_key = (cell[0] // TERRAIN_CHUNK_TILES, cell[1] // TERRAIN_CHUNK_TILES)
+            if self.headless or chunk_key not in self.streamer.loaded:
+                continue
+            tile = self.terrain_tiles.pop(cell, None)
+            if tile:
+                tile.kill()
+            if self.tilemap.is_solid(*cell):
+                self.add_terrain_tile(*cell)
+            dirty_chunks.add(chunk_key)
+        
+        for chunk_key in dirty_chunks:
+            self.rebake_chunk(chunk_key)
+    
+    def rebake_chunk(self, chunk_key):
+        """Rebuild one baked terrain chunk from the tiles currently inside it"""
+        old_chunk = self.terrain_chunks.pop(chunk_key, None)
+        if old_chunk:
+            old_chunk.kill()
         
+        chunk_x, chunk_y = chunk_key
+        tiles = [self.terrain_tiles[(col, row)]
+                 for row in range(chunk_y * TERRAIN_CHUNK_TILES, (chunk_y + 1) * TERRAIN_CHUNK_TILES)
+                 for col in range(chunk_x * TERRAIN_CHUNK_TILES, (chunk_x + 1) * TERRAIN_CHUNK_TILES)
+                 if (col, row) in self.terrain_tiles]
+        if tiles and not self.headless:
+            chunk = bake_terrain_chunks(tiles)[chunk_key]
+            self.terrain_chunks[chunk_key] = chunk
+            self.visible_sprites.add(chunk, layer='terrain')
+    
+    def setup_clouds(self, level_width):
+        """Place background clouds for atmosphere (created when their chunk streams in)"""
         # Create clouds at various positions
         cloud_positions = [
             (200, 100), (500, 80), (800, 120), (1100, 90),
@@ -79,13 +318,15 @@ class Level:
             (400, 50), (900, 60), (1200, 100)
         ]
         
-        for i, pos in enumerate(cloud_positions):
-            # Use different cloud types for variety
-            cloud_type = (i % 3) + 1
-            cloud = Cloud(pos, cloud_type)
-            self.visible_sprites.add(cloud)
-            self.active_sprites.add(cloud)  # Add to active for movement
-            self.cloud_sprites.add(cloud)
+        chunk_size = TERRAIN_CHUNK_TILES * TILE_SIZE
+        
+        # Repeat the pattern every CLOUD_PATTERN_WIDTH pixels so wider levels get proportionally more sky
+        for start_x in range(0, max(level_width, 1), CLOUD_PATTERN_WIDTH):
+            for i, (x, y) in enumerate(cloud_positions):
+                # Use different cloud types for variety
+                cloud_type = (i % 3) + 1
+                chunk_key = ((start_x + x) // chunk_size, y // chunk_size)
+                self.chunk_objects.setdefault(chunk_key, []).append(('cloud', ((start_x + x, y), cloud_type)))
     
     def horizontal_movement_collision(self):
         """Handle horizontal collision detection - FIXED VERSION"""
@@ -94,37 +335,27 @@ class Level:
         # Move player horizontally
         player.rect.x += player.direction.x * player.speed
         
-        # Check for collisions
-        for sprite in self.collision_sprites.sprites():
-            if sprite.rect.colliderect(player.rect):
-                if player.direction.x < 0:  # Moving left
-                    player.rect.left = sprite.rect.right
-                elif player.direction.x > 0:  # Moving right
-                    player.rect.right = sprite.rect.left
+        # Check for collisions against the cells the player overlaps
+        self.tilemap.resolve_horizontal(player.rect, player.direction.x)
     
     def vertical_movement_collision(self):
         """Handle vertical collision detection - FIXED VERSION"""
         player = self.player.sprite
         player.apply_gravity()
         
-        # Reset ground status
-        player.on_ground = False
-        
-        for sprite in self.collision_sprites.sprites():
-            if sprite.rect.colliderect(player.rect):
-                if player.direction.y > 0:  # Falling
-                    player.rect.bottom = sprite.rect.top
-                    player.direction.y = 0
-                    player.on_ground = True
-                elif player.direction.y < 0:  # Jumping
-                    player.rect.top = sprite.rect.bottom
-                    player.direction.y = 0
+        # Ground status is only set when the player lands on a cell this frame
+        player.on_ground = self.tilemap.resolve_vertical(player.rect, player.direction)
     
     def check_coin_collision(self):
         """Check if player collected any coins"""
-        collected_coins = pygame.sprite.spritecollide(self.player.sprite, self.coin_sprites, True)
+        # Coin rects are padded by the float amplitude above and below, so test them against a
+        # player rect shrunk by the same amount: the pickups match the unpadded coins exactly
+        self.coin_probe.rect = self.player.sprite.rect.inflate(0, -2 * COIN_FLOAT_AMPLITUDE)
+        collected_coins = pygame.sprite.spritecollide(self.coin_probe, self.coin_sprites, True)
         if collected_coins:
             self.coins_collected += len(collected_coins)
+            for coin in collected_coins:
+                self.coin_bits |= 1 << self.coin_index[coin_cell(coin)]
             # You could add a coin collection sound effect here
     
     def check_goal_collision(self):
@@ -133,10 +364,18 @@ class Level:
             if pygame.sprite.spritecollide(self.player.sprite, self.goal_sprites, False):
                 self.game_won = True
     
-    def run(self, elapsed_time, dt=1/60):
-        """Main level update method"""
-        # Update active sprites
+    def step(self, dt=1/60, inputs=None):
+        """Advance the simulation by one tick without drawing.
+        
+        inputs is an InputState for the player; None reads the keyboard.
+        """
+        self.player.sprite.inputs = inputs
+        self.visible_sprites.remember_positions()
+        
+        # Advance every animation type once, then update the sprites that move
+        self.animations.advance(dt)
         self.active_sprites.update(dt)
+        self.scheduler.update(dt, self.visible_sprites.view_rect())
         
         # Handle collisions - FIXED ORDER
         self.horizontal_movement_collision()
@@ -148,33 +387,108 @@ class Level:
         # Check goal
         self.check_goal_collision()
         
+        # Camera follows the resolved player position
+        self.visible_sprites.box_target_camera(self.player.sprite)
+        
+        # Stream chunks in and out around the new view
+        self.streamer.update(self.visible_sprites.view_rect())
+    
+    def draw(self, alpha=1.0):
+        """Draw the level and the win message.
+        
+        alpha is how far the frame lies between the previous and the latest tick (0-1);
+        moving sprites and the camera are interpolated between the two.
+        Returns the screen rects that changed since the last frame, or None if the
+        whole screen may have (only tracked when DIRTY_RECTS is on).
+        """
         # Draw everything
-        self.visible_sprites.custom_draw(self.player.sprite)
+        self.visible_sprites.custom_draw(alpha)
+        changed = self.visible_sprites.changed_rects
         
         # Display win message
         if self.game_won:
-            font = pygame.font.Font(None, 72)
-            win_text = font.render('YOU WIN!', True, (255, 255, 0))
+            win_text = text_cache.render(text_cache.font(None, 72), 'YOU WIN!', (255, 255, 0))
             win_rect = win_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             self.display_surface.blit(win_text, win_rect)
+            if changed is not None:
+                # A new list, so the camera's own changed_rects is left as it drew them
+                changed = changed + [win_rect]
+        
+        return changed
+    
+    def run(self, elapsed_time, dt=1/60):
+        """Main level update method"""
+        self.step(dt)
+        self.draw()
 
 class CameraGroup(pygame.sprite.Group):
-    def __init__(self):
+    def __init__(self, display_surface=None):
         super().__init__()
-        self.display_surface = pygame.display.get_surface()
+        # Headless levels have no surface; the camera still tracks a screen-sized view
+        self.display_surface = display_surface
+        self.screen_size = display_surface.get_size() if display_surface else (SCREEN_WIDTH, SCREEN_HEIGHT)
         self.offset = pygame.math.Vector2()
+        self.previous_offset = pygame.math.Vector2()
         
         # Camera box setup
-        self.half_w = self.display_surface.get_size()[0] // 2
-        self.half_h = self.display_surface.get_size()[1] // 2
+        self.half_w = self.screen_size[0] // 2
+        self.half_h = self.screen_size[1] // 2
         
         # Camera borders
         self.camera_borders = {'left': 200, 'right': 200, 'top': 100, 'bottom': 100}
         l = self.camera_borders['left']
         t = self.camera_borders['top']
-        w = self.display_surface.get_size()[0] - (self.camera_borders['left'] + self.camera_borders['right'])
-        h = self.display_surface.get_size()[1] - (self.camera_borders['top'] + self.camera_borders['bottom'])
+        w = self.screen_size[0] - (self.camera_borders['left'] + self.camera_borders['right'])
+        h = self.screen_size[1] - (self.camera_borders['top'] + self.camera_borders['bottom'])
         self.camera_rect = pygame.Rect(l, t, w, h)
+        
+        # Render layers in back-to-front order, each with its own culling index
+        self.layers = {name: RenderLayer(name, moving, y_sort)
+                       for name, (moving, y_sort) in RENDER_LAYERS.items()}
+        self.sprite_layers = {}
+        
+        # Per-frame culling counters
+        self.sprites_drawn = 0
+        self.sprites_culled = 0
+        
+        # Change tracking for dirty-rect presentation: what each sprite looked like and
+        # where it was drawn last frame, and the screen rects that changed this frame
+        # (None = the whole screen, e.g. because the camera moved)
+        self.track_changes = DIRTY_RECTS
+        self.drawn = {}
+        self.drawn_offset = None
+        self.changed_rects = None
+    
+    def add(self, *sprites, layer='actors'):
+        """Add sprites to the given render layer"""
+        for sprite in sprites:
+            if not self.has_internal(sprite):
+                self.add_internal(sprite, layer)
+                sprite.add_internal(self)
+    
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        layer = layer or 'actors'
+        self.sprite_layers[sprite] = layer
+        self.layers[layer].add(sprite)
+    
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.layers[self.sprite_layers.pop(sprite)].remove(sprite)
+    
+    def sprite_moved(self, sprite, old_topleft):
+        """Hand a sprite moved outside the per-frame refresh to its layer"""
+        self.layers[self.sprite_layers[sprite]].moved(sprite, old_topleft)
+    
+    def remember_positions(self):
+        """Record camera and moving sprite positions before a simulation tick"""
+        self.previous_offset.update(self.offset)
+        for layer in self.layers.values():
+            layer.remember_positions()
+    
+    def view_rect(self):
+        """World-space rect currently shown on screen"""
+        return pygame.Rect(int(self.offset.x), int(self.offset.y), *self.screen_size)
     
     def center_target_camera(self, target):
         """Center camera on target"""
@@ -195,19 +509,58 @@ class CameraGroup(pygame.sprite.Group):
         self.offset.x = self.camera_rect.left - self.camera_borders['left']
         self.offset.y = self.camera_rect.top - self.camera_borders['top']
     
-    def custom_draw(self, player):
+    def custom_draw(self, alpha=1.0):
         """Custom draw method with camera and layered rendering"""
-        # Update camera
-        self.box_target_camera(player)
-        
-        # Draw clouds first (background layer)
-        for sprite in self.sprites():
-            if hasattr(sprite, '__class__') and sprite.__class__.__name__ == 'Cloud':
-                offset_pos = sprite.rect.topleft - self.offset
-                self.display_surface.blit(sprite.image, offset_pos)
-        
-        # Draw all other sprites (foreground layer)
-        for sprite in sorted(self.sprites(), key=lambda sprite: sprite.rect.centery):
-            if not (hasattr(sprite, '__class__') and sprite.__class__.__name__ == 'Cloud'):
-                offset_pos = sprite.rect.topleft - self.offset
-                self.display_surface.blit(sprite.image, offset_pos)
+        # Camera offset interpolated between the last two ticks
+        offset = self.previous_offset.lerp(self.offset, alpha) if alpha < 1 else self.offset
+        offset_x, offset_y = round(offset.x), round(offset.y)
+        
+        # Draw each layer back to front, culled to the viewport
+        view = pygame.Rect(offset_x, offset_y, *self.screen_size)
+        blit = self.display_surface.blit
+        drawn = 0
+        track = self.track_changes
+        states = {}
+        for layer in self.layers.values():
+            layer.refresh()
+            previous = layer.previous if alpha < 1 else None
+            for sprite in layer.visible(view):
+                x, y = sprite.rect.topleft
+                if previous and sprite in previous:
+                    # Moving sprite: draw between where it was and where it is
+                    previous_x, previous_y = previous[sprite]
+                    x = round(previous_x + (x - previous_x) * alpha)
+                    y = round(previous_y + (y - previous_y) * alpha)
+                blit(sprite.image, (x - offset_x, y - offset_y))
+                drawn += 1
+                if track:
+                    states[sprite] = (sprite.image, x - offset_x, y - offset_y)
+        
+        self.sprites_drawn = drawn
+        self.sprites_culled = len(self) - drawn
+        if track:
+            self.find_changes(states, (offset_x, offset_y))
+    
+    def find_changes(self, states, offset):
+        """Compare this frame's sprite images and screen positions with the last frame's"""
+        previous = self.drawn
+        if offset != self.drawn_offset:
+            # Camera moved: every pixel may have changed
+            self.changed_rects = None
+        else:
+            changed = []
+            for sprite, state in states.items():
+                old_state = previous.pop(sprite, None)
+                if old_state != state:
+                    image, x, y = state
+                    changed.append(pygame.Rect(x, y, *image.get_size()))
+                    if old_state:
+                        old_image, old_x, old_y = old_state
+                        changed.append(pygame.Rect(old_x, old_y, *old_image.get_size()))
+            # Sprites that left the view or were removed
+            for old_image, old_x, old_y in previous.values():
+                changed.append(pygame.Rect(old_x, old_y, *old_image.get_size()))
+            self.changed_rects = changed
+        
+        self.drawn = states
+        self.drawn_offset = offset
@@ -0,0 +1,191 @@
+"""Compact binary level files.
+    
+    python levelfile.py levels/level.plvl                 # convert settings.level_map
+    python levelfile.py levels/big.plvl --source big.txt  # convert a text map, one row per line
+
+File layout, all little-endian:
+    header       LEVEL_HEADER
+    chunk table  one CHUNK_ENTRY per chunk, row-major over the chunk grid
+    coin table   one COIN_ENTRY per coin, grouped by chunk in chunk table order
+    tile data    per chunk: the chunk's cells row-major as alternating empty/solid
+                 run lengths, one byte each (longer runs continue after a 0-length
+                 run of the other kind); all-empty chunks have no data
+
+LevelFile memory-maps a file and only decodes a chunk's terrain and coins when
+the level asks for them, so opening even a huge level is a header read.
+"""
+import mmap
+import struct
+from settings import TERRAIN_CHUNK_TILES
+from replay import level_id
+
+LEVEL_HEADER = struct.Struct('<4sHHHHhhhhII')  # magic, version, width, height, chunk tiles, player col/row, goal col/row, coin count, level id
+CHUNK_ENTRY = struct.Struct('<IIIH')  # tile data offset, tile data length, first coin, coin count
+COIN_ENTRY = struct.Struct('<HH')  # col, row
+LEVEL_MAGIC = b'PLVL'
+LEVEL_VERSION = 1
+MAX_RUN = 255
+
+def encode_runs(cells):
+    """0/1 cell bytes -> alternating empty/solid run lengths, starting with empty"""
+    runs = bytearray()
+    value = 0
+    run = 0
+    for cell in cells:
+        if cell == value:
+            run += 1
+            continue
+        while run > MAX_RUN:
+            runs += bytes((MAX_RUN, 0))
+            run -= MAX_RUN
+        runs.append(run)
+        value, run = cell, 1
+    while run > MAX_RUN:
+        runs += bytes((MAX_RUN, 0))
+        run -= MAX_RUN
+    runs.append(run)
+    return bytes(runs)
+
+def decode_runs(runs):
+    """Alternating empty/solid run lengths -> 0/1 cell bytes"""
+    cells = bytearray()
+    fill = (b'\x00', b'\x01')
+    value = 0
+    for run in runs:
+        cells += fill[value] * run
+        value ^= 1
+    return cells
+
+def encode_level(layout, chunk_tiles=TERRAIN_CHUNK_TILES):
+    """Convert a string level map (X terrain, P player, F goal, C coin) to level file bytes"""
+    height = len(layout)
+    width = max((len(row) for row in layout), default=0)
+    rows = [row.ljust(width) for row in layout]
+    chunk_cols = -(-width // chunk_tiles)
+    chunk_rows = -(-height // chunk_tiles)
+    
+    player = goal = (-1, -1)
+    for row_index, row in enumerate(rows):
+        for col_index, cell in enumerate(row):
+            if cell == 'P':
+                player = (col_index, row_index)
+            elif cell == 'F':
+                goal = (col_index, row_index)
+    
+    entries = []
+    coins = []
+    tile_data = bytearray()
+    data_start = LEVEL_HEADER.size + chunk_cols * chunk_rows * CHUNK_ENTRY.size
+    chunks = []
+    for chunk_y in range(chunk_rows):
+        for chunk_x in range(chunk_cols):
+            left, top = chunk_x * chunk_tiles, chunk_y * chunk_tiles
+            cells = bytearray()
+            first_coin = len(coins)
+            for row in range(top, min(top + chunk_tiles, height)):
+                for col in range(left, min(left + chunk_tiles, width)):
+                    cell = rows[row][col]
+                    cells.append(cell == 'X')
+                    if cell == 'C':
+                        coins.append((col, row))
+            chunks.append((cells, first_coin, len(coins) - first_coin))
+    
+    # Tile data follows the coin table, so offsets are only known once it is sized
+    data_start += len(coins) * COIN_ENTRY.size
+    for cells, first_coin, coin_count in chunks:
+        runs = encode_runs(cells) if any(cells) else b''
+        entries.append(CHUNK_ENTRY.pack(data_start + len(tile_data) if runs else 0, len(runs), first_coin, coin_count))
+        tile_data += runs
+    
+    header = LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, width, height, chunk_tiles,
+                               *player, *goal, len(coins), level_id(layout))
+    return b''.join([header, *entries, *(COIN_ENTRY.pack(*coin) for coin in coins), tile_data])
+
+def save_level(path, layout, chunk_tiles=TERRAIN_CHUNK_TILES):
+    """Write a string level map to a level file"""
+    with open(path, 'wb') as level_file:
+        level_file.write(encode_level(layout, chunk_tiles))
+
+class LevelFile:
+    """Read-only view of a level file that decodes chunks on demand"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as level_file:
+            try:
+                self.data = mmap.mmap(level_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # No mmap for this file (or platform): fall back to reading it
+                self.data = level_file.read()
+        
+        if len(self.data) < LEVEL_HEADER.size:
+            raise ValueError(f'{path} is not a level file')
+        (magic, version, self.width, self.height, self.chunk_tiles, player_col, player_row,
+         goal_col, goal_row, self.coin_count, self.level_id) = LEVEL_HEADER.unpack_from(self.data)
+        if magic != LEVEL_MAGIC or version != LEVEL_VERSION:
+            raise ValueError(f'{path} is not a level file')
+        
+        self.player_start = (player_col, player_row) if player_col >= 0 else None
+        self.goal = (goal_col, goal_row) if goal_col >= 0 else None
+        self.chunk_cols = -(-self.width // self.chunk_tiles)
+        self.chunk_rows = -(-self.height // self.chunk_tiles)
+        self.coin_table = LEVEL_HEADER.size + self.chunk_cols * self.chunk_rows * CHUNK_ENTRY.size
+    
+    def chunk_entry(self, chunk_key):
+        """(tile data offset, tile data length, first coin, coin count) of a chunk, or None outside the level"""
+        chunk_x, chunk_y = chunk_key
+        if not (0 <= chunk_x < self.chunk_cols and 0 <= chunk_y < self.chunk_rows):
+            return None
+        return CHUNK_ENTRY.unpack_from(self.data, LEVEL_HEADER.size + (chunk_y * self.chunk_cols + chunk_x) * CHUNK_ENTRY.size)
+    
+    def chunk_terrain(self, chunk_key):
+        """Decoded terrain of a chunk as (left col, top row, width, 0/1 cell bytes), or None if it has none"""
+        entry = self.chunk_entry(chunk_key)
+        if entry is None or not entry[1]:
+            return None
+        offset, length = entry[0], entry[1]
+        chunk_x, chunk_y = chunk_key
+        left = chunk_x * self.chunk_tiles
+        width = min(self.chunk_tiles, self.width - left)
+        return left, chunk_y * self.chunk_tiles, width, decode_runs(self.data[offset:offset + length])
+    
+    def chunk_coins(self, chunk_key):
+        """(col, row) of every coin in a chunk"""
+        entry = self.chunk_entry(chunk_key)
+        if entry is None:
+            return []
+        first_coin, coin_count = entry[2], entry[3]
+        start = self.coin_table + first_coin * COIN_ENTRY.size
+        return list(COIN_ENTRY.iter_unpack(self.data[start:start + coin_count * COIN_ENTRY.size]))
+    
+    def coins(self):
+        """(col, row) of every coin in the level, in coin table order"""
+        start = self.coin_table
+        return list(COIN_ENTRY.iter_unpack(self.data[start:start + self.coin_count * COIN_ENTRY.size]))
+    
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+def main():
+    import argparse
+    from settings import level_map
+    
+    parser = argparse.ArgumentParser(description='Convert a string level map to a level file')
+    parser.add_argument('output', help='level file to write')
+    parser.add_argument('--source', metavar='PATH', help='text map, one row per line (default: settings.level_map)')
+    args = parser.parse_args()
+    
+    if args.source:
+        with open(args.source) as source:
+            layout = source.read().splitlines()
+    else:
+        layout = level_map
+    save_level(args.output, layout)
+    
+    level_file = LevelFile(args.output)
+    print(f'{args.output}: {level_file.width}x{level_file.height} tiles, {level_file.coin_count} coins, '
+          f'{len(level_file.data)} bytes')
+    level_file.close()
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,67 @@
 import pygame, sys
+import argparse
 import asyncio
+import random
+import time
 from settings import *
 from level import Level
+from controls import read_keyboard
+from replay import InputRecorder, InputReplay
+from levelfile import LevelFile
+from rewind import RewindBuffer
+from debug_overlay import DebugOverlay
+from hud import text_cache
+from render import ScreenUpdater
+from support import asset_paths, preload_images, save_surface_cache, startup_report, surface_cache_pending
 
-async def main():
+def draw_loading_screen(screen, font, done, total):
+    """Draw the loading progress bar shown while graphics are decoded"""
+    screen.fill('skyblue')
+    bar_rect = pygame.Rect(0, 0, 400, 24)
+    bar_rect.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    fill_rect = bar_rect.copy()
+    fill_rect.width = int(bar_rect.width * done / total) if total else bar_rect.width
+    
+    pygame.draw.rect(screen, (255, 215, 0), fill_rect, border_radius=5)
+    pygame.draw.rect(screen, (0, 0, 0), bar_rect, 2, border_radius=5)
+    text_surf = font.render(f'Loading... {done}/{total}', True, (0, 0, 0))
+    screen.blit(text_surf, text_surf.get_rect(midbottom=(bar_rect.centerx, bar_rect.top - 10)))
+    pygame.display.flip()
+
+async def main(record_path=None, replay_path=None, level_path=None, report_startup=False):
+    startup_started = time.perf_counter()
+    
     # Pygame setup
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption('Fixed Pirate Platform Jumper')
     clock = pygame.time.Clock()
     
-    # Create level after pygame is initialized
-    level = Level(level_map, screen)
+    # Decode graphics on worker threads while the window shows progress
+    loading_font = pygame.font.Font(None, 36)
+    last_drawn = 0
+    for done, total in preload_images(asset_paths(PRELOAD_FOLDERS)):
+        now = pygame.time.get_ticks()
+        if done == 0 or done == total or now - last_drawn >= 16:
+            draw_loading_screen(screen, loading_font, done, total)
+            pygame.event.pump()
+            last_drawn = now
+            # Yield to browser for web compatibility
+            await asyncio.sleep(0)
+    
+    # Create level after pygame is initialized; a level file replaces the built-in map
+    layout = LevelFile(level_path) if level_path else level_map
+    level = Level(layout, screen)
+    rewind = RewindBuffer(level)  # Hold R to step back through the last few seconds
+    
+    # Persist freshly decoded pixels so the next launch can skip PNG decoding
+    if surface_cache_pending():
+        save_surface_cache()
+    if report_startup:
+        print(startup_report(time.perf_counter() - startup_started))
     
     # Button font
-    button_font = pygame.font.Font(None, 36)
+    button_font = text_cache.font(None, 36)
     
     # Retry button
     retry_text = button_font.render('RETRY', True, (255, 255, 255))
@@ -31,13 +78,33 @@ async def main():
     elapsed_time = 0
     game_started = False
     
-    # Delta time for smooth animations
-    dt = 0
+    # Fixed-step simulation: real frame time accumulates and is consumed in FIXED_DT ticks
+    accumulator = 0.0
+    
+    # Input recording / replay; button clicks are delivered on the next tick
+    replay = InputReplay(replay_path, layout) if replay_path else None
+    if replay:
+        replay.seed_random()
+        seed = replay.seed
+    else:
+        seed = time.time_ns() & 0xFFFFFFFF
+        random.seed(seed)
+    recorder = InputRecorder(layout, seed) if record_path else None
+    start_clicked = retry_clicked = False
+    
+    # Performance overlay, toggled with F3; costs nothing while hidden
+    overlay = DebugOverlay()
+    
+    # Presents only the changed parts of the screen while the camera is still
+    screen_updater = ScreenUpdater(screen.get_size(), DIRTY_MAX_FRACTION)
+    hud_started = game_started
     
     running = True
     while running:
         # Calculate delta time
-        dt = clock.tick(60) / 1000.0  # Convert to seconds
+        frame_time = clock.tick(FPS) / 1000.0  # Convert to seconds
+        accumulator += frame_time
+        overlay.begin_frame()
         
         # Update elapsed time only if game has started and not won
         if game_started and not level.game_won:
@@ -48,29 +115,78 @@ async def main():
             if event.type == pygame.QUIT:
                 running = False
             
-            # Check for button clicks
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # Retry button
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                overlay.toggle(level)
+            
+            # Check for button clicks (replays use the recorded clicks instead)
+            if event.type == pygame.MOUSEBUTTONDOWN and not replay:
                 if retry_button_bg.collidepoint(event.pos):
-                    # Restart the game by creating a new level and resetting timer
-                    level = Level(level_map, screen)
-                    if game_started:
-                        start_time = pygame.time.get_ticks()
-                    else:
-                        elapsed_time = 0
-                
-                # Start button
-                if start_button_bg.collidepoint(event.pos) and not game_started:
-                    game_started = True
-                    start_time = pygame.time.get_ticks()
+                    retry_clicked = True
+                if start_button_bg.collidepoint(event.pos):
+                    start_clicked = True
         
         # STEP 1: Clear screen with sky blue background
         screen.fill('skyblue')
         
-        # STEP 2: Run game logic and draw elements
-        level.run(elapsed_time, dt)
+        # STEP 2: Run game logic in fixed ticks, capped so a long stall can't snowball
+        steps = 0
+        while accumulator >= FIXED_DT and steps < MAX_STEPS_PER_FRAME:
+            inputs = replay.next_inputs() if replay else None
+            if inputs is None:
+                if replay:
+                    # Log exhausted: report whether it reproduced the recording, then hand back control
+                    print('Replay finished:', 'positions match' if replay.matches() else 'DESYNC')
+                    replay = None
+                inputs = read_keyboard()._replace(start=start_clicked, retry=retry_clicked)
+                start_clicked = retry_clicked = False
+            if recorder:
+                recorder.record(inputs)
+            
+            # Retry button
+            if inputs.retry:
+                # Restart the game by resetting the level in place and resetting timer
+                level.reset()
+                rewind.clear()
+                if game_started:
+                    start_time = pygame.time.get_ticks()
+                else:
+                    elapsed_time = 0
+            
+            # Start button
+            if inputs.start and not game_started:
+                game_started = True
+                start_time = pygame.time.get_ticks()
+            
+            if inputs.rewind:
+                rewind.rewind()
+            else:
+                rewind.capture()
+                level.step(FIXED_DT, inputs)
+            accumulator -= FIXED_DT
+            steps += 1
+            
+            if recorder:
+                recorder.track(level.player.sprite.rect)
+            if replay:
+                replay.track(level.player.sprite.rect)
+        if steps == MAX_STEPS_PER_FRAME:
+            # Drop the backlog but keep the fraction of a tick for interpolation
+            accumulator %= FIXED_DT
+        
+        # Draw elements interpolated between the last two ticks
+        changed_rects = level.draw(accumulator / FIXED_DT)
+        if changed_rects is None:
+            screen_updater.mark_all()
+        else:
+            screen_updater.mark(*changed_rects)
+        
+        # The buttons and instructions only change when the game starts
+        if game_started != hud_started:
+            screen_updater.mark_all()
+            hud_started = game_started
         
         # STEP 3: Draw UI elements
+        overlay.start_phase('hud')
         # Draw retry button
         pygame.draw.rect(screen, (50, 50, 200), retry_button_bg, border_radius=5)
         pygame.draw.rect(screen, (0, 0, 0), retry_button_bg, 2, border_radius=5)
@@ -88,51 +204,66 @@ async def main():
             seconds = int((elapsed_time % 60000) / 1000)
             milliseconds = int((elapsed_time % 1000) / 10)
             time_str = f"Time: {minutes:02d}:{seconds:02d}.{milliseconds:02d}"
+            # Changes every frame, so compose it from cached glyphs
+            time_rect = text_cache.draw_glyphs(screen, button_font, time_str, (0, 0, 0), (SCREEN_WIDTH - 200, 10))
         else:
-            time_str = "Time: 00:00.00"
-        
-        time_surf = button_font.render(time_str, True, (0, 0, 0))
-        screen.blit(time_surf, (SCREEN_WIDTH - 200, 10))
+            time_surf = text_cache.render(button_font, "Time: 00:00.00", (0, 0, 0))
+            time_rect = screen.blit(time_surf, (SCREEN_WIDTH - 200, 10))
+        screen_updater.mark(time_rect)
         
-        # Draw coin counter
+        # Draw coin counter, gold with a black outline for better visibility
         coin_str = f"Coins: {level.coins_collected}/{level.total_coins}"
-        coin_surf = button_font.render(coin_str, True, (255, 215, 0))  # Gold color
-        # Add black outline for better visibility
-        coin_outline = button_font.render(coin_str, True, (0, 0, 0))
-        screen.blit(coin_outline, (SCREEN_WIDTH - 199, 49))  # Offset for outline
-        screen.blit(coin_outline, (SCREEN_WIDTH - 201, 49))
-        screen.blit(coin_outline, (SCREEN_WIDTH - 200, 48))
-        screen.blit(coin_outline, (SCREEN_WIDTH - 200, 50))
-        screen.blit(coin_surf, (SCREEN_WIDTH - 200, 49))
+        coin_surf = text_cache.outlined(button_font, coin_str, (255, 215, 0), (0, 0, 0))
+        coin_rect = screen.blit(coin_surf, (SCREEN_WIDTH - 201, 48))  # Outline margin puts the text at (-200, 49)
+        screen_updater.mark(coin_rect)
         
         # Draw instructions and game info
         if not game_started:
-            instruction_font = pygame.font.Font(None, 24)
+            instruction_font = text_cache.font(None, 24)
             instructions = [
                 "Use ARROW KEYS to move freely",
                 "Press SPACE to jump",
+                "Hold R to rewind",
                 "Collect coins and reach the animated palm tree to win!",
                 "Click START to begin timer", 
             ]
             for i, instruction in enumerate(instructions):
                 color =  (0, 0, 0)
-                text_surf = instruction_font.render(instruction, True, color)
+                text_surf = text_cache.render(instruction_font, instruction, color)
                 screen.blit(text_surf, (20, 200 + i * 25))
         
-        # Debug info removed for clean gameplay experience
+        overlay.stop_phase('hud')
+        
+        # Performance overlay (F3)
+        overlay.end_frame()
+        screen_updater.mark(overlay.draw(screen, clock.get_fps()))
         
         # STEP 4: Update display
-        pygame.display.flip()
+        if DIRTY_RECTS:
+            screen_updater.present()
+        else:
+            pygame.display.flip()
         
         # Yield to browser for web compatibility
         await asyncio.sleep(0)
     
+    if recorder:
+        recorder.save(record_path)
     pygame.quit()
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='Pirate Platform Adventure')
+    parser.add_argument('--record', metavar='PATH', help='record per-tick input to a replay log')
+    parser.add_argument('--replay', metavar='PATH', help='play back a recorded replay log')
+    parser.add_argument('--level', metavar='PATH', help='play a level file made with levelfile.py')
+    parser.add_argument('--startup-report', action='store_true', help='print how startup time was spent')
+    return parser.parse_args()
+
 # Entry point
 if __name__ == "__main__":
     if sys.platform == 'emscripten':
         asyncio.run(main())
     else:
         # For desktop, use this
-        asyncio.run(main())
+        args = parse_args()
+        asyncio.run(main(args.record, args.replay, args.level, args.startup_report))
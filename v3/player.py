@@ -1,22 +1,23 @@
 import pygame
 from settings import *
 from support import import_character_assets
+from controls import read_keyboard
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, pos):
+    def __init__(self, pos, animation_clock):
         super().__init__()
         
         # Load player graphics
         self.load_graphics()
         
-        # Animation setup
-        self.frame_index = 0
+        # Animation setup; frames follow the level's shared animation clock
+        self.animation_clock = animation_clock
         self.animation_speed = 8
         self.status = 'idle'
         self.facing_right = True
         
         # Set initial image and rect
-        self.image = self.animations[f'{self.status}_right'][int(self.frame_index)]
+        self.image = self.animations[f'{self.status}_right'][0]
         self.rect = self.image.get_rect(topleft=pos)
         
         # Player movement - SIMPLIFIED AND FIXED
@@ -27,6 +28,19 @@ class Player(pygame.sprite.Sprite):
         
         # Player status - SIMPLIFIED
         self.on_ground = False
+        
+        # Injected input for this tick (InputState); None reads the keyboard
+        self.inputs = None
+    
+    def reset(self, pos):
+        """Put the player back at pos, standing still"""
+        self.status = 'idle'
+        self.facing_right = True
+        self.image = self.animations[f'{self.status}_right'][0]
+        self.rect.topleft = pos
+        self.direction.update(0, 0)
+        self.on_ground = False
+        self.inputs = None
     
     def load_graphics(self):
         """Load all player animation graphics"""
@@ -52,19 +66,19 @@ class Player(pygame.sprite.Sprite):
     
     def get_input(self):
         """FIXED input handling - no restrictions"""
-        keys = pygame.key.get_pressed()
+        inputs = self.inputs if self.inputs is not None else read_keyboard()
         
         # Reset horizontal movement
         self.direction.x = 0
         
-        if keys[pygame.K_RIGHT]:
+        if inputs.right:
             self.direction.x = 1
             self.facing_right = True
-        elif keys[pygame.K_LEFT]:
+        elif inputs.left:
             self.direction.x = -1
             self.facing_right = False
-            
-        if keys[pygame.K_SPACE] and self.on_ground:
+        
+        if inputs.jump and self.on_ground:
             self.jump()
     
     def get_status(self):
@@ -91,13 +105,8 @@ class Player(pygame.sprite.Sprite):
             # Fallback to idle if animation doesn't exist
             current_animation = self.animations.get(f'idle_{direction}', [self.image])
         
-        # Update frame index
-        self.frame_index += self.animation_speed * dt
-        if self.frame_index >= len(current_animation):
-            self.frame_index = 0
-        
         # Set current image
-        self.image = current_animation[int(self.frame_index)]
+        self.image = current_animation[self.animation_clock.frame_at(self.animation_speed, len(current_animation))]
     
     def apply_gravity(self):
         """Apply gravity to player"""
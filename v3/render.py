@@ -0,0 +1,150 @@
+import pygame
+from bisect import bisect_left, bisect_right
+from spatial import SpatialHash
+
+class RenderLayer:
+    """One draw layer of the camera, culled through its own spatial index.
+    
+    Static layers are never re-examined once a sprite is added; if one of their
+    sprites does move, whoever moved it reports it through moved(). Moving layers
+    re-file their sprites each frame, and y-sorted layers keep a persistent
+    draw order where only sprites whose rect.centery changed are re-inserted.
+    Unsorted layers draw in the order sprites were added, so overlapping sprites
+    (like drifting clouds) keep their stacking as they are re-filed in the index.
+    """
+    def __init__(self, name, moving=False, y_sort=False):
+        self.name = name
+        self.moving = moving
+        self.y_sort = y_sort
+        self.sprites = {}   # sprite -> insertion number, for a stable draw order
+        self.added = 0
+        self.index = SpatialHash()
+        
+        # Positions at the start of the current simulation tick, for interpolated drawing
+        self.previous = {}
+        
+        # Persistent y-order: parallel lists of sort keys and sprites
+        self.order_keys = []
+        self.order = []
+        self.sort_key = {}
+    
+    def __len__(self):
+        return len(self.sprites)
+    
+    def add(self, sprite):
+        self.sprites[sprite] = self.added
+        self.added += 1
+        if self.y_sort:
+            self.insert_sorted(sprite)
+        else:
+            self.index.insert(sprite)
+    
+    def remove(self, sprite):
+        if sprite not in self.sprites:
+            return
+        del self.sprites[sprite]
+        self.previous.pop(sprite, None)
+        if self.y_sort:
+            self.remove_sorted(sprite)
+        else:
+            self.index.remove(sprite)
+    
+    def insert_sorted(self, sprite):
+        key = sprite.rect.centery
+        position = bisect_right(self.order_keys, key)
+        self.order_keys.insert(position, key)
+        self.order.insert(position, sprite)
+        self.sort_key[sprite] = key
+    
+    def remove_sorted(self, sprite):
+        key = self.sort_key.pop(sprite)
+        position = bisect_left(self.order_keys, key)
+        while self.order[position] is not sprite:
+            position += 1
+        del self.order_keys[position]
+        del self.order[position]
+    
+    def remember_positions(self):
+        """Record where moving sprites are before a simulation tick moves them"""
+        if self.moving:
+            self.previous = {sprite: sprite.rect.topleft for sprite in self.sprites}
+        elif self.previous:
+            # Static layers only hold the sprites reported through moved() last tick
+            self.previous = {}
+    
+    def moved(self, sprite, old_topleft):
+        """A sprite in a static layer moved during this tick; re-file it and interpolate from old_topleft"""
+        if not self.y_sort:
+            self.index.move(sprite)
+        self.previous.setdefault(sprite, old_topleft)
+    
+    def refresh(self):
+        """Bring the index and draw order up to date with sprites that moved"""
+        if not self.moving:
+            return
+        if self.y_sort:
+            sort_key = self.sort_key
+            for sprite in self.sprites:
+                if sprite.rect.centery != sort_key[sprite]:
+                    self.remove_sorted(sprite)
+                    self.insert_sorted(sprite)
+        else:
+            for sprite in self.sprites:
+                self.index.move(sprite)
+    
+    def visible(self, view):
+        """Sprites overlapping the view rect, in draw order"""
+        if self.y_sort:
+            # Small dynamic layer: one linear pass over the persistent order
+            return [sprite for sprite in self.order if view.colliderect(sprite.rect)]
+        found = [sprite for sprite in self.index.query(view) if view.colliderect(sprite.rect)]
+        found.sort(key=self.sprites.__getitem__)
+        return found
+
+class ScreenUpdater:
+    """Sends each finished frame to the display, flipping only when it has to.
+    
+    Callers mark the screen regions that changed this frame; present() then
+    updates just those regions plus last frame's (so anything that moved or
+    vanished is cleared). Marking the whole screen, or enough small regions to
+    cover most of it, falls back to a full flip.
+    """
+    def __init__(self, screen_size, max_fraction=0.5):
+        self.screen_rect = pygame.Rect((0, 0), screen_size)
+        self.max_area = screen_size[0] * screen_size[1] * max_fraction
+        self.rects = []
+        self.previous = []
+        self.full = True
+        
+        # Frame counters, for profiling
+        self.full_updates = 0
+        self.partial_updates = 0
+        self.skipped_updates = 0
+    
+    def mark(self, *rects):
+        """Mark screen regions as changed; None entries are ignored"""
+        self.rects.extend(rect for rect in rects if rect)
+    
+    def mark_all(self):
+        """Mark the whole screen as changed"""
+        self.full = True
+    
+    def present(self):
+        """Push this frame to the display and start tracking the next one"""
+        rects = [rect.clip(self.screen_rect) for rect in self.rects + self.previous]
+        rects = [rect for rect in rects if rect]
+        
+        if self.full or sum(rect.width * rect.height for rect in rects) > self.max_area:
+            pygame.display.flip()
+            self.full_updates += 1
+        elif rects:
+            pygame.display.update(rects)
+            self.partial_updates += 1
+        else:
+            # Nothing changed on screen
+            self.skipped_updates += 1
+        
+        # Whatever was drawn this frame must be cleared if it changes next frame
+        self.previous = self.rects
+        self.rects = []
+        self.full = False
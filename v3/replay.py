@@ -0,0 +1,92 @@
+import random
+import struct
+import zlib
+from controls import InputState
+
+# Log layout: header, then one byte of input bits per tick
+LOG_HEADER = struct.Struct('<4sHIQII')  # magic, version, level id, seed, tick count, position checksum
+LOG_MAGIC = b'PRPL'
+LOG_VERSION = 1
+
+def level_id(layout):
+    """Stable identifier of a level layout (level files carry the id of the map they were converted from)"""
+    if hasattr(layout, 'level_id'):
+        return layout.level_id
+    return zlib.crc32('\n'.join(layout).encode())
+
+def pack_inputs(inputs):
+    """InputState -> one byte, one bit per field"""
+    byte = 0
+    for bit, pressed in enumerate(inputs):
+        if pressed:
+            byte |= 1 << bit
+    return byte
+
+def unpack_inputs(byte):
+    """One byte -> InputState"""
+    return InputState(*(bool(byte >> bit & 1) for bit in range(len(InputState._fields))))
+
+def track_position(checksum, rect):
+    """Fold a player position into a running checksum"""
+    return zlib.crc32(struct.pack('<ii', rect.x, rect.y), checksum)
+
+class InputRecorder:
+    """Captures per-tick input into a compact binary log"""
+    def __init__(self, layout, seed):
+        self.level_id = level_id(layout)
+        self.seed = seed
+        self.ticks = bytearray()
+        self.checksum = 0
+    
+    def record(self, inputs):
+        """Store the input used for one tick"""
+        self.ticks.append(pack_inputs(inputs))
+    
+    def track(self, rect):
+        """Fold the player position after a tick into the log's checksum"""
+        self.checksum = track_position(self.checksum, rect)
+    
+    def save(self, path):
+        with open(path, 'wb') as log_file:
+            log_file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, self.level_id, self.seed,
+                                           len(self.ticks), self.checksum))
+            log_file.write(self.ticks)
+
+class InputReplay:
+    """Feeds a recorded log back one tick at a time and checks the positions it produces"""
+    def __init__(self, path, layout):
+        with open(path, 'rb') as log_file:
+            data = log_file.read()
+        magic, version, recorded_level, self.seed, tick_count, self.expected_checksum = LOG_HEADER.unpack_from(data)
+        if magic != LOG_MAGIC or version != LOG_VERSION:
+            raise ValueError(f'{path} is not a replay log')
+        if recorded_level != level_id(layout):
+            raise ValueError(f'{path} was recorded on a different level')
+        
+        self.ticks = data[LOG_HEADER.size:LOG_HEADER.size + tick_count]
+        self.position = 0
+        self.checksum = 0
+    
+    @property
+    def finished(self):
+        return self.position >= len(self.ticks)
+    
+    def next_inputs(self):
+        """Input for the next tick, or None once the log is exhausted"""
+        if self.finished:
+            return None
+        byte = self.ticks[self.position]
+        self.position += 1
+        return unpack_inputs(byte)
+    
+    def track(self, rect):
+        """Fold the player position after a tick into the replay's checksum"""
+        self.checksum = track_position(self.checksum, rect)
+    
+    def matches(self):
+        """True if the replayed positions reproduced the recording exactly"""
+        return self.finished and self.checksum == self.expected_checksum
+    
+    def seed_random(self):
+        """Restore the recorded random seed"""
+        random.seed(self.seed)
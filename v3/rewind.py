@@ -0,0 +1,84 @@
+import struct
+from settings import REWIND_TICKS
+
+# One tick of level state: player rect position, velocity, on_ground, facing_right, status,
+# game_won, coins_collected, animation time, camera offset and camera box position.
+# The picked-up coin bit set follows, in a fixed number of bytes per level.
+SNAPSHOT = struct.Struct('<iiddBBBBIdddii')
+PLAYER_STATUSES = ('idle', 'run', 'jump', 'fall')
+
+class RewindBuffer:
+    """Fixed-size ring of per-tick level snapshots for rewinding.
+    
+    Records are packed into one preallocated bytearray, so capturing or restoring
+    a tick is a struct call and a few attribute writes, and memory stays at
+    capacity * record_size however long the game runs. Once the ring is full the
+    oldest tick is overwritten. Clouds are scenery and are not rewound.
+    """
+    def __init__(self, level, capacity=REWIND_TICKS):
+        self.level = level
+        self.coin_bytes = (level.total_coins + 7) // 8
+        self.record_size = SNAPSHOT.size + self.coin_bytes
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * self.record_size)
+        self.head = 0   # Slot the next capture goes into
+        self.count = 0  # Ticks that can be rewound
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        self.head = 0
+        self.count = 0
+    
+    def capture(self):
+        """Store the level's current state as the newest tick"""
+        level = self.level
+        player = level.player.sprite
+        camera = level.visible_sprites
+        offset = self.head * self.record_size
+        
+        SNAPSHOT.pack_into(self.buffer, offset, player.rect.x, player.rect.y,
+                           player.direction.x, player.direction.y, player.on_ground, player.facing_right,
+                           PLAYER_STATUSES.index(player.status), level.game_won, level.coins_collected,
+                           level.animations.time, camera.offset.x, camera.offset.y,
+                           camera.camera_rect.x, camera.camera_rect.y)
+        coins_start = offset + SNAPSHOT.size
+        self.buffer[coins_start:coins_start + self.coin_bytes] = level.coin_bits.to_bytes(self.coin_bytes, 'little')
+        
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    def rewind(self):
+        """Restore the newest stored tick and drop it; returns False once there is nothing left"""
+        if not self.count:
+            return False
+        self.head = (self.head - 1) % self.capacity
+        self.count -= 1
+        
+        level = self.level
+        player = level.player.sprite
+        camera = level.visible_sprites
+        offset = self.head * self.record_size
+        (x, y, direction_x, direction_y, on_ground, facing_right, status, game_won, coins_collected,
+         time, offset_x, offset_y, camera_x, camera_y) = SNAPSHOT.unpack_from(self.buffer, offset)
+        
+        player.rect.topleft = (x, y)
+        player.direction.update(direction_x, direction_y)
+        player.on_ground = bool(on_ground)
+        player.facing_right = bool(facing_right)
+        player.status = PLAYER_STATUSES[status]
+        level.game_won = bool(game_won)
+        level.coins_collected = coins_collected
+        level.animations.set_time(time)
+        player.animate(0)  # Image for the restored status and time
+        
+        coins_start = offset + SNAPSHOT.size
+        level.restore_coins(int.from_bytes(self.buffer[coins_start:coins_start + self.coin_bytes], 'little'))
+        
+        # Camera, with no interpolation from where it was
+        camera.camera_rect.topleft = (camera_x, camera_y)
+        camera.offset.update(offset_x, offset_y)
+        camera.remember_positions()
+        level.streamer.update(camera.view_rect())
+        return True
@@ -0,0 +1,74 @@
+from spatial import SpatialHash
+
+class UpdateScheduler:
+    """Updates entities at a rate set by how close they are to the camera.
+    
+    Activity tiers, decided each tick from the view rect:
+      visible - overlapping the view: updated every tick
+      near    - within near_margin of the view: updated every near_interval ticks
+                with the skipped time passed on as one larger dt
+      far     - everything else: asleep, not even looked at
+    
+    Entities are found through a spatial index of the near region only, so the
+    per-tick cost depends on what is around the camera, not on the level size.
+    """
+    def __init__(self, near_margin, near_interval, on_moved=None):
+        self.near_margin = near_margin
+        self.near_interval = max(near_interval, 1)
+        self.on_moved = on_moved  # Called as on_moved(sprite, old_topleft) after a sprite moves
+        self.index = SpatialHash()
+        self.phases = {}    # sprite -> tick phase, so throttled updates are spread across ticks
+        self.pending = {}   # near sprite -> dt accumulated since its last update
+        self.tick = 0
+        
+        # Work done in the last tick, for profiling
+        self.updated = 0
+        self.visible = 0
+        self.near = 0
+    
+    def __len__(self):
+        return len(self.phases)
+    
+    def add(self, sprite):
+        self.phases[sprite] = len(self.phases) % self.near_interval
+        self.index.insert(sprite)
+    
+    def remove(self, sprite):
+        self.phases.pop(sprite, None)
+        self.pending.pop(sprite, None)
+        self.index.remove(sprite)
+    
+    def update(self, dt, view):
+        """Run one tick for the entities around the view rect"""
+        self.tick += 1
+        margin = self.near_margin
+        awake = self.index.query(view.inflate(2 * margin, 2 * margin))
+        
+        # Entities that drifted out of range fall asleep and lose their pending time
+        pending = self.pending
+        for sprite in [sprite for sprite in pending if sprite not in awake]:
+            del pending[sprite]
+        
+        updated = visible = 0
+        turn = self.tick % self.near_interval
+        for sprite in awake:
+            if view.colliderect(sprite.rect):
+                step_dt = pending.pop(sprite, 0.0) + dt
+                visible += 1
+            elif self.phases[sprite] != turn:
+                pending[sprite] = pending.get(sprite, 0.0) + dt
+                continue
+            else:
+                step_dt = pending.pop(sprite, 0.0) + dt
+            
+            old_topleft = sprite.rect.topleft
+            sprite.update(step_dt)
+            updated += 1
+            if sprite.rect.topleft != old_topleft:
+                self.index.move(sprite)
+                if self.on_moved:
+                    self.on_moved(sprite, old_topleft)
+        
+        self.updated = updated
+        self.visible = visible
+        self.near = len(awake) - visible
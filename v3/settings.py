@@ -4,12 +4,61 @@ import pygame
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 700
 TILE_SIZE = 64
+FPS = 60
+
+# Fixed-step simulation: physics constants below are per tick of FIXED_DT seconds
+FIXED_DT = 1 / 60
+MAX_STEPS_PER_FRAME = 5  # Catch-up cap; a longer stall drops time instead of spiralling
+
+TERRAIN_CHUNK_TILES = 16  # Static terrain is baked into chunks of 16x16 tiles
+CLOUD_PATTERN_WIDTH = 2048  # The background cloud layout repeats every 2048 px of level width
+
+# Dirty-rect presentation: while the camera is still, only changed screen regions are sent to the display
+DIRTY_RECTS = True
+DIRTY_MAX_FRACTION = 0.5  # Above this share of the screen a full flip is cheaper
+
+# Rewind: holding R steps back through the last REWIND_SECONDS of ticks
+REWIND_SECONDS = 10
+REWIND_TICKS = round(REWIND_SECONDS / FIXED_DT)
 
 # Player settings - IMPROVED for better jumping
 PLAYER_SPEED = 8
 GRAVITY = 0.8
 JUMP_STRENGTH = -18  # Increased jump power
 
+# Update scheduling: entities within UPDATE_NEAR_MARGIN px of the view update every
+# UPDATE_NEAR_INTERVAL ticks, visible ones every tick, and the rest sleep
+UPDATE_NEAR_MARGIN = 512
+UPDATE_NEAR_INTERVAL = 4
+
+# Chunk streaming: chunks within STREAM_LOAD_MARGIN px of the view get their sprites created,
+# and chunks further than STREAM_UNLOAD_MARGIN px away release them again
+STREAM_LOAD_MARGIN = 512
+STREAM_UNLOAD_MARGIN = 1536
+
+# Coins float COIN_FLOAT_AMPLITUDE px up and down once every COIN_FLOAT_PERIOD seconds
+COIN_FLOAT_AMPLITUDE = 3
+COIN_FLOAT_PERIOD = 2.0
+COIN_FLOAT_STEPS = 24  # Precomputed float offsets per cycle
+
+# Graphics decoded up front behind the loading screen
+PRELOAD_FOLDERS = [
+    'graphics/player',
+    'graphics/terrain/land',
+    'graphics/terrain/palm/large_fg',
+    'graphics/items/gold',
+    'graphics/clouds',
+]
+
+# Render layers, drawn back to front: name -> (moving, y_sort)
+RENDER_LAYERS = {
+    'background': (False, False),  # Drifting clouds, re-filed by the update scheduler when they move
+    'terrain': (False, False),     # Static platforms
+    'items': (False, False),       # Coins
+    'actors': (True, True),        # Player, sorted by rect.centery
+    'foreground': (False, False),  # Goal palm, drawn in front of the player
+}
+
 # Colors
 BG_COLOR = (107, 140, 255)
 PLAYER_COLOR = (255, 0, 0)  # Bright Red
@@ -0,0 +1,59 @@
+class SpatialHash:
+    """Uniform grid of buckets for finding sprites inside a rect without a full scan"""
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self.cells = {}    # (cell_x, cell_y) -> {sprite: None}, an ordered set
+        self.bounds = {}   # sprite -> (left, top, right, bottom) cell range it is filed under
+    
+    def __len__(self):
+        return len(self.bounds)
+    
+    def __contains__(self, sprite):
+        return sprite in self.bounds
+    
+    def cell_range(self, rect):
+        """Inclusive range of cells a rect overlaps"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+    
+    def insert(self, sprite):
+        """File a sprite under every cell its rect overlaps"""
+        bounds = self.cell_range(sprite.rect)
+        self.bounds[sprite] = bounds
+        left, top, right, bottom = bounds
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                self.cells.setdefault((cell_x, cell_y), {})[sprite] = None
+    
+    def remove(self, sprite):
+        """Forget a sprite"""
+        bounds = self.bounds.pop(sprite, None)
+        if bounds is None:
+            return
+        left, top, right, bottom = bounds
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                bucket = self.cells.get((cell_x, cell_y))
+                if bucket is not None:
+                    bucket.pop(sprite, None)
+                    if not bucket:
+                        del self.cells[(cell_x, cell_y)]
+    
+    def move(self, sprite):
+        """Re-file a sprite whose rect may have changed (cheap when it stayed in its cells)"""
+        if self.bounds.get(sprite) != self.cell_range(sprite.rect):
+            self.remove(sprite)
+            self.insert(sprite)
+    
+    def query(self, rect):
+        """Return the sprites filed under the cells a rect overlaps, without duplicates"""
+        found = {}
+        left, top, right, bottom = self.cell_range(rect)
+        cells = self.cells
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket:
+                    found.update(bucket)
+        return found
@@ -0,0 +1,53 @@
+class ChunkStreamer:
+    """Keeps the square world regions around the camera loaded.
+    
+    Regions within load_margin px of the view are loaded and regions further
+    than unload_margin px away are released; the gap between the two margins
+    stops a region on the edge from loading and unloading every other tick.
+    What loading a region means is up to the load/unload callbacks, which are
+    called with the region key (column, row) in units of chunk_size px.
+    """
+    def __init__(self, chunk_size, load_margin, unload_margin, load, unload):
+        self.chunk_size = chunk_size
+        self.load_margin = load_margin
+        self.unload_margin = max(unload_margin, load_margin)
+        self.load = load
+        self.unload = unload
+        self.loaded = set()
+        self.wanted_range = None
+        
+        # Totals, for profiling
+        self.loads = 0
+        self.unloads = 0
+    
+    def chunk_range(self, rect):
+        """Inclusive (left, top, right, bottom) range of regions a rect overlaps"""
+        size = self.chunk_size
+        return (rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size)
+    
+    def update(self, view):
+        """Load and release regions for the current view rect"""
+        load_margin = self.load_margin
+        wanted_range = self.chunk_range(view.inflate(2 * load_margin, 2 * load_margin))
+        if wanted_range == self.wanted_range:
+            # Still inside the same regions: nothing to do
+            return
+        self.wanted_range = wanted_range
+        
+        # Release regions that fell outside the unload margin
+        unload_margin = self.unload_margin
+        left, top, right, bottom = self.chunk_range(view.inflate(2 * unload_margin, 2 * unload_margin))
+        for key in [key for key in self.loaded
+                    if not (left <= key[0] <= right and top <= key[1] <= bottom)]:
+            self.loaded.discard(key)
+            self.unload(key)
+            self.unloads += 1
+        
+        left, top, right, bottom = wanted_range
+        for chunk_y in range(top, bottom + 1):
+            for chunk_x in range(left, right + 1):
+                key = (chunk_x, chunk_y)
+                if key not in self.loaded:
+                    self.loaded.add(key)
+                    self.load(key)
+                    self.loads += 1
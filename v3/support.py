@@ -1,17 +1,332 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import time
 import pygame
-from os import walk
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from os import walk, listdir
+
+ATLAS_DIR = 'graphics/atlas'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# The browser build has no threads, so preloading decodes serially there
+PRELOAD_THREADS = sys.platform != 'emscripten'
+
+# On-disk cache of decoded pixels, keyed by source path and mtime. The browser
+# build has no persistent filesystem, so it always decodes.
+SURFACE_CACHE_PATH = '.cache/surfaces.bin'
+SURFACE_CACHE_ENABLED = sys.platform != 'emscripten'
+_SURFACE_CACHE_HEADER = struct.Struct('<4sII')  # magic, version, index length
+_SURFACE_CACHE_MAGIC = b'PGSC'
+_SURFACE_CACHE_VERSION = 1
+
+# Process-wide asset cache: every path is decoded and converted once, and the
+# resulting surface is shared by every sprite that asks for it
+_image_cache = {}    # image path -> surface
+_folder_cache = {}   # folder path -> list of image paths, in walk order
+_cache_stats = {'hits': 0, 'misses': 0, 'atlas_frames': 0,
+                'disk_hits': 0, 'decodes': 0, 'load_seconds': 0.0}
+
+# Texture atlases written by build_atlas.py, read lazily on first use
+_atlas_frames = {}   # image path -> (sheet path, (x, y, w, h))
+_atlas_folders = {}  # folder path -> list of image paths, in walk order
+_atlas_loaded = False
+
+def load_atlases(atlas_dir=ATLAS_DIR):
+    """Read every atlas index so images and folders can be served from their sheets"""
+    global _atlas_loaded
+    _atlas_loaded = True
+    try:
+        index_names = [name for name in listdir(atlas_dir) if name.endswith('.json')]
+    except OSError:
+        # No atlases built: fall back to the individual image files
+        return
+    
+    for index_name in index_names:
+        with open(f'{atlas_dir}/{index_name}') as index_file:
+            index = json.load(index_file)
+        for image_path, rect in index['frames'].items():
+            _atlas_frames[image_path] = (index['image'], tuple(rect))
+        _atlas_folders.update(index['folders'])
+    _folder_cache.update(_atlas_folders)
+
+# Surface cache file state: the open memory map, its index, and pixels decoded this run
+_disk_map = None
+_disk_data_start = 0
+_disk_index = {}     # image path -> [mtime_ns, width, height, offset, length]
+_disk_pending = {}   # image path -> (mtime_ns, width, height, RGBA bytes)
+_disk_opened = False
+
+def open_surface_cache(cache_path=SURFACE_CACHE_PATH):
+    """Memory-map the surface cache file and read its index"""
+    global _disk_map, _disk_data_start, _disk_opened
+    _disk_opened = True
+    if not SURFACE_CACHE_ENABLED:
+        return
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            _disk_map = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # Missing or empty cache file: everything is decoded and saved later
+        return
+    
+    try:
+        magic, version, index_length = _SURFACE_CACHE_HEADER.unpack_from(_disk_map, 0)
+        if magic != _SURFACE_CACHE_MAGIC or version != _SURFACE_CACHE_VERSION:
+            raise ValueError('not a surface cache file')
+        index_start = _SURFACE_CACHE_HEADER.size
+        _disk_data_start = index_start + index_length
+        _disk_index.update(json.loads(_disk_map[index_start:_disk_data_start]))
+    except (struct.error, ValueError):
+        # Unreadable cache: ignore it, it is rewritten on the next save
+        close_surface_cache()
+
+def close_surface_cache():
+    """Release the memory map (surfaces built from it have already been copied)"""
+    global _disk_map
+    if _disk_map is not None:
+        _disk_map.close()
+        _disk_map = None
+    _disk_index.clear()
+
+def cached_surface(path, mtime):
+    """Unconverted surface rebuilt from the surface cache file, or None if missing or stale"""
+    entry = _disk_index.get(path)
+    if not entry or entry[0] != mtime:
+        return None
+    width, height, offset, length = entry[1:]
+    start = _disk_data_start + offset
+    return pygame.image.frombuffer(memoryview(_disk_map)[start:start + length], (width, height), 'RGBA')
+
+def decode_file(path):
+    """Decode an image file, returning (surface, mtime, RGBA pixels for the surface cache).
+    
+    Touches no shared state, so it is safe to run on worker threads.
+    """
+    if not SURFACE_CACHE_ENABLED:
+        return pygame.image.load(path), None, None
+    mtime = os.stat(path).st_mtime_ns
+    surface = pygame.image.load(path)
+    return surface, mtime, pygame.image.tobytes(surface, 'RGBA')
+
+def record_decoded(path, surface, mtime, pixels):
+    """Count a fresh decode and queue its pixels for the next surface cache save"""
+    _cache_stats['decodes'] += 1
+    if pixels is not None:
+        _disk_pending[path] = (mtime, surface.get_width(), surface.get_height(), pixels)
+
+def decode_image(path):
+    """Return the unconverted surface for an image file, from the surface cache when it is current"""
+    if not _disk_opened:
+        open_surface_cache()
+    if SURFACE_CACHE_ENABLED:
+        surface = cached_surface(path, os.stat(path).st_mtime_ns)
+        if surface is not None:
+            _cache_stats['disk_hits'] += 1
+            return surface
+    
+    # Stale or missing entry: decode and queue the pixels for the next save
+    surface, mtime, pixels = decode_file(path)
+    record_decoded(path, surface, mtime, pixels)
+    return surface
+
+def surface_cache_pending():
+    """True if pixels were decoded this run that the surface cache file doesn't hold yet"""
+    return SURFACE_CACHE_ENABLED and bool(_disk_pending)
+
+def save_surface_cache(cache_path=SURFACE_CACHE_PATH):
+    """Rewrite the surface cache file if anything was decoded this run"""
+    if not SURFACE_CACHE_ENABLED or not _disk_pending:
+        return
+    
+    # Keep current entries from the old file, replace stale ones with fresh pixels
+    blobs = {}
+    for path, (mtime, width, height, offset, length) in _disk_index.items():
+        if path not in _disk_pending:
+            start = _disk_data_start + offset
+            blobs[path] = (mtime, width, height, _disk_map[start:start + length])
+    blobs.update(_disk_pending)
+    
+    # Offsets in the index are relative to the start of the pixel data
+    index = {}
+    offset = 0
+    for path, (mtime, width, height, pixels) in blobs.items():
+        index[path] = [mtime, width, height, offset, len(pixels)]
+        offset += len(pixels)
+    index_bytes = json.dumps(index).encode()
+    
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    temp_path = cache_path + '.tmp'
+    with open(temp_path, 'wb') as cache_file:
+        cache_file.write(_SURFACE_CACHE_HEADER.pack(_SURFACE_CACHE_MAGIC, _SURFACE_CACHE_VERSION, len(index_bytes)))
+        cache_file.write(index_bytes)
+        for mtime, width, height, pixels in blobs.values():
+            cache_file.write(pixels)
+    
+    close_surface_cache()
+    os.replace(temp_path, cache_path)
+    _disk_pending.clear()
+    open_surface_cache(cache_path)
+
+def convert_for_display(surface):
+    """convert_alpha when a display exists; headless runs keep a private copy of the raw pixels"""
+    if pygame.display.get_surface() is None:
+        # The raw surface may point into the surface cache memory map, so copy it
+        return surface.copy()
+    return surface.convert_alpha()
+
+def load_image(path):
+    """Load an image through the asset cache and return the shared surface"""
+    surface = _image_cache.get(path)
+    if surface is not None:
+        _cache_stats['hits'] += 1
+        return surface
+    
+    if not _atlas_loaded:
+        load_atlases()
+    
+    if path in _atlas_frames:
+        # Cut the image out of its (cached) atlas sheet instead of opening the file
+        sheet_path, rect = _atlas_frames[path]
+        surface = load_image(sheet_path).subsurface(rect)
+        _cache_stats['atlas_frames'] += 1
+    else:
+        _cache_stats['misses'] += 1
+        started = time.perf_counter()
+        surface = convert_for_display(decode_image(path))
+        _cache_stats['load_seconds'] += time.perf_counter() - started
+    _image_cache[path] = surface
+    return surface
+
+def preload_images(paths, workers=None):
+    """Decode images on a thread pool and convert them on the calling thread.
+    
+    A generator: yields (done, total) as each source file lands in the asset cache,
+    so the caller can draw a loading screen between images. Atlas frames are
+    preloaded by loading their sheet; surface cache hits skip the pool entirely.
+    Only time spent inside the generator counts towards load_seconds.
+    """
+    steps = _preload_steps(paths, workers)
+    while True:
+        started = time.perf_counter()
+        try:
+            progress = next(steps)
+        except StopIteration:
+            return
+        finally:
+            _cache_stats['load_seconds'] += time.perf_counter() - started
+        yield progress
+
+def _preload_steps(paths, workers):
+    if not _atlas_loaded:
+        load_atlases()
+    if not _disk_opened:
+        open_surface_cache()
+    
+    sources = dict.fromkeys(_atlas_frames[path][0] if path in _atlas_frames else path for path in paths)
+    sources = [path for path in sources if path not in _image_cache]
+    total = len(sources)
+    done = 0
+    yield done, total
+    
+    def store(path, surface):
+        _cache_stats['misses'] += 1
+        _image_cache[path] = convert_for_display(surface)
+    
+    to_decode = []
+    for path in sources:
+        surface = cached_surface(path, os.stat(path).st_mtime_ns) if SURFACE_CACHE_ENABLED else None
+        if surface is None:
+            to_decode.append(path)
+        else:
+            _cache_stats['disk_hits'] += 1
+            store(path, surface)
+            done += 1
+            yield done, total
+    
+    if PRELOAD_THREADS and len(to_decode) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = {pool.submit(decode_file, path): path for path in to_decode}
+            for job in as_completed(jobs):
+                path = jobs[job]
+                surface, mtime, pixels = job.result()
+                record_decoded(path, surface, mtime, pixels)
+                store(path, surface)
+                done += 1
+                yield done, total
+    else:
+        for path in to_decode:
+            surface, mtime, pixels = decode_file(path)
+            record_decoded(path, surface, mtime, pixels)
+            store(path, surface)
+            done += 1
+            yield done, total
+
+def asset_paths(folders):
+    """Every image path under the given folders, from the atlas indexes when they are built"""
+    if not _atlas_loaded:
+        load_atlases()
+    
+    paths = []
+    for folder in folders:
+        prefix = folder + '/'
+        atlas_paths = [path for atlas_folder, images in _atlas_folders.items()
+                       if atlas_folder == folder or atlas_folder.startswith(prefix) for path in images]
+        if atlas_paths:
+            paths.extend(atlas_paths)
+            continue
+        for folder_name, sub_folders, img_files in walk(folder):
+            folder_name = folder_name.replace(os.sep, '/')
+            paths.extend(folder_name + '/' + name for name in img_files if name.endswith(IMAGE_EXTENSIONS))
+    return paths
+
+def folder_image_paths(path):
+    """List the image files directly inside a folder (cached after the first walk)"""
+    if not _atlas_loaded:
+        load_atlases()
+    
+    paths = _folder_cache.get(path)
+    if paths is None:
+        paths = []
+        for folder_name, sub_folders, img_files in walk(path):
+            for image_name in img_files:
+                if image_name.endswith(IMAGE_EXTENSIONS):
+                    paths.append(path + '/' + image_name)
+        _folder_cache[path] = paths
+    return paths
+
+def asset_cache_stats():
+    """Hit/miss counts and memory held by the asset cache"""
+    return {
+        'hits': _cache_stats['hits'],
+        'misses': _cache_stats['misses'],
+        'atlas_frames': _cache_stats['atlas_frames'],
+        'disk_hits': _cache_stats['disk_hits'],
+        'decodes': _cache_stats['decodes'],
+        'load_seconds': _cache_stats['load_seconds'],
+        'surfaces': len(_image_cache),
+        # Atlas frames are views into their sheet, so only surfaces that own pixels count
+        'bytes': sum(surf.get_pitch() * surf.get_height()
+                     for surf in _image_cache.values() if surf.get_parent() is None),
+    }
+
+def startup_report(total_seconds):
+    """One-line summary of how startup time was spent loading assets"""
+    stats = asset_cache_stats()
+    return (f"Startup {total_seconds * 1000:.1f} ms: "
+            f"{stats['surfaces']} surfaces, {stats['decodes']} decoded, "
+            f"{stats['disk_hits']} from surface cache, {stats['atlas_frames']} atlas frames, "
+            f"image loading {stats['load_seconds'] * 1000:.1f} ms")
 
 def import_folder(path):
     """Import all images from a folder and return as a list"""
     surface_list = []
     
     try:
-        for folder_name, sub_folders, img_files in walk(path):
-            for image_name in img_files:
-                if image_name.endswith(('.png', '.jpg', '.jpeg')):
-                    full_path = path + '/' + image_name
-                    image_surf = pygame.image.load(full_path).convert_alpha()
-                    surface_list.append(image_surf)
+        for full_path in folder_image_paths(path):
+            surface_list.append(load_image(full_path))
     except:
         # If path doesn't exist, return empty list
         pass
@@ -23,12 +338,9 @@ def import_folder_dict(path):
     surface_dict = {}
     
     try:
-        for folder_name, sub_folders, img_files in walk(path):
-            for image_name in img_files:
-                if image_name.endswith(('.png', '.jpg', '.jpeg')):
-                    full_path = path + '/' + image_name
-                    image_surf = pygame.image.load(full_path).convert_alpha()
-                    surface_dict[image_name.split('.')[0]] = image_surf
+        for full_path in folder_image_paths(path):
+            image_name = full_path.split('/')[-1]
+            surface_dict[image_name.split('.')[0]] = load_image(full_path)
     except:
         # If path doesn't exist, return empty dict
         pass
@@ -39,6 +351,18 @@ def import_character_assets(path):
     """Import character animation assets organized by state and direction"""
     character_dict = {}
     
+    if not _atlas_loaded:
+        load_atlases()
+    
+    # Atlas indexes already know the sub folders, so no directory walk is needed
+    prefix = path + '/'
+    atlas_sub_folders = [folder[len(prefix):] for folder in _atlas_folders
+                         if folder.startswith(prefix) and '/' not in folder[len(prefix):]]
+    if atlas_sub_folders:
+        for sub_folder in atlas_sub_folders:
+            character_dict[sub_folder] = import_folder(prefix + sub_folder)
+        return character_dict
+    
     try:
         for folder_name, sub_folders, img_files in walk(path):
             if sub_folders:  # If there are subfolders (like idle_right, run_left, etc.)
@@ -0,0 +1,319 @@
+from array import array
+from settings import TILE_SIZE, TERRAIN_CHUNK_TILES
+
+# Autotile neighbour letters, clockwise from the cell above: (col offset, row offset)
+NEIGHBOUR_OFFSETS = {
+    'A': (0, -1),
+    'B': (1, -1),
+    'C': (1, 0),
+    'D': (1, 1),
+    'E': (0, 1),
+    'F': (-1, 1),
+    'G': (-1, 0),
+    'H': (-1, -1),
+}
+NEIGHBOUR_LETTERS = tuple(NEIGHBOUR_OFFSETS)
+
+# Each diagonal neighbour only shapes a tile if one of the edges beside it is solid
+DIAGONAL_EDGES = {'B': 'AC', 'D': 'CE', 'F': 'EG', 'H': 'GA'}
+
+# bytes.translate table turning 0/1 cell bytes into '0'/'1' digits
+_BIT_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+# bytes.translate table turning layout characters into 0/1 cell bytes
+_SOLID_CELLS = bytes(1 if code == ord('X') else 0 for code in range(256))
+
+def mask_letters(mask):
+    """Neighbour mask -> autotile name, e.g. 0b10101 -> 'ACE'"""
+    return ''.join(letter for bit, letter in enumerate(NEIGHBOUR_LETTERS) if mask >> bit & 1)
+
+def autotile_key(mask, available):
+    """Pick the best available autotile name for a neighbour mask, falling back to 'X'"""
+    key = mask_letters(mask)
+    if key in available:
+        return key
+    
+    # Drop diagonals that no solid edge touches, then all diagonals
+    reduced = ''.join(letter for letter in key
+                      if letter not in DIAGONAL_EDGES or any(edge in key for edge in DIAGONAL_EDGES[letter]))
+    if reduced in available:
+        return reduced
+    edges_only = ''.join(letter for letter in key if letter not in DIAGONAL_EDGES)
+    if edges_only in available:
+        return edges_only
+    return 'X'
+
+def merge_cells(solid, width, left, top, right, bottom):
+    """Greedily merge the solid cells of a region into rectangles.
+    
+    Scanning row by row, each solid cell not yet covered starts a rectangle that
+    is widened along its row as far as the cells stay solid and uncovered, then
+    grown downwards while the whole span below is too. Returns (col, row, cols, rows).
+    """
+    region_width = right - left
+    covered = bytearray(region_width * (bottom - top))
+    rects = []
+    for row in range(top, bottom):
+        base = row * width
+        covered_base = (row - top) * region_width - left
+        col = left
+        while col < right:
+            start = solid.find(1, base + col, base + right)
+            if start < 0:
+                break
+            col = start - base
+            if covered[covered_base + col]:
+                col += 1
+                continue
+            
+            # Widen along the row
+            stop = solid.find(0, base + col, base + right)
+            end = right if stop < 0 else stop - base
+            stop = covered.find(1, covered_base + col, covered_base + end)
+            if stop >= 0:
+                end = stop - covered_base
+            span = end - col
+            
+            # Grow downwards while the row below is solid and uncovered across the span
+            solid_span = b'\x01' * span
+            last = row + 1
+            while (last < bottom and solid[last * width + col:last * width + end] == solid_span
+                   and covered.find(1, covered_base + (last - row) * region_width + col,
+                                    covered_base + (last - row) * region_width + end) < 0):
+                last += 1
+            for covered_row in range(last - row):
+                offset = covered_base + covered_row * region_width
+                covered[offset + col:offset + end] = solid_span
+            
+            rects.append((col, row, span, last - row))
+            col = end
+    return rects
+
+class TileMap:
+    """Compact grid of solid terrain cells built from a level layout"""
+    def __init__(self, layout, tile_size=TILE_SIZE):
+        self.tile_size = tile_size
+        self.height = len(layout)
+        self.width = max((len(row) for row in layout), default=0)
+        
+        # One byte per cell, row-major: 1 = solid terrain, 0 = empty
+        self.solid = bytearray(self.width * self.height)
+        for row_index, row in enumerate(layout):
+            base = row_index * self.width
+            self.solid[base:base + len(row)] = row.encode('ascii', 'replace').translate(_SOLID_CELLS)
+        
+        # 8-neighbour autotile mask per cell (bit i = NEIGHBOUR_LETTERS[i]), 0 for empty cells
+        self.masks = self.compute_masks()
+        
+        # Solid cells merged into rectangular colliders, per terrain chunk so an edit only
+        # re-merges its own chunk; collider_ids maps each cell to its collider (0 = empty)
+        self.colliders = {}  # collider id -> world-space rect (x, y, w, h)
+        self.chunk_colliders = {}  # chunk key -> collider ids
+        self.collider_ids = array('I', [0]) * (self.width * self.height)
+        self.next_collider_id = 1
+        for chunk_y in range(-(-self.height // TERRAIN_CHUNK_TILES)):
+            for chunk_x in range(-(-self.width // TERRAIN_CHUNK_TILES)):
+                self.merge_chunk((chunk_x, chunk_y))
+    
+    def is_solid(self, col, row):
+        """Return True if the cell holds terrain (cells outside the map are empty)"""
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return self.solid[row * self.width + col] == 1
+        return False
+    
+    def row_bits(self, row):
+        """Solid cells of a row packed into an int (bit c = column c)"""
+        if not 0 <= row < self.height:
+            return 0
+        base = row * self.width
+        digits = bytes(self.solid[base:base + self.width]).translate(_BIT_DIGITS)
+        return int(digits[::-1], 2) if digits else 0
+    
+    def compute_masks(self):
+        """Neighbour masks for the whole map in one sweep.
+        
+        Every row is packed into an int, so each neighbour direction of a row is a
+        single shift of the row above, below or itself; only solid cells then read
+        their bits out of the eight shifted rows.
+        """
+        width = self.width
+        full = (1 << width) - 1
+        masks = bytearray(width * self.height)
+        
+        above, current = 0, self.row_bits(0)
+        for row in range(self.height):
+            below = self.row_bits(row + 1)
+            if current:
+                planes = (
+                    above,                   # A
+                    above >> 1,              # B
+                    current >> 1,            # C
+                    below >> 1,              # D
+                    below,                   # E
+                    (below << 1) & full,     # F
+                    (current << 1) & full,   # G
+                    (above << 1) & full,     # H
+                )
+                base = row * width
+                for col in range(width):
+                    if current >> col & 1:
+                        mask = 0
+                        for bit, plane in enumerate(planes):
+                            mask |= (plane >> col & 1) << bit
+                        masks[base + col] = mask
+            above, current = current, below
+        
+        return masks
+    
+    def merge_chunk(self, chunk_key):
+        """Rebuild the colliders of one terrain chunk from its solid cells"""
+        for collider_id in self.chunk_colliders.pop(chunk_key, ()):
+            del self.colliders[collider_id]
+        
+        chunk_x, chunk_y = chunk_key
+        left = chunk_x * TERRAIN_CHUNK_TILES
+        top = chunk_y * TERRAIN_CHUNK_TILES
+        right = min(left + TERRAIN_CHUNK_TILES, self.width)
+        bottom = min(top + TERRAIN_CHUNK_TILES, self.height)
+        ids = self.collider_ids
+        for row in range(top, bottom):
+            ids[row * self.width + left:row * self.width + right] = array('I', [0]) * (right - left)
+        
+        size = self.tile_size
+        chunk_ids = []
+        for col, row, cols, rows in merge_cells(self.solid, self.width, left, top, right, bottom):
+            collider_id = self.next_collider_id
+            self.next_collider_id += 1
+            self.colliders[collider_id] = (col * size, row * size, cols * size, rows * size)
+            chunk_ids.append(collider_id)
+            for covered_row in range(row, row + rows):
+                base = covered_row * self.width
+                ids[base + col:base + col + cols] = array('I', [collider_id]) * cols
+        if chunk_ids:
+            self.chunk_colliders[chunk_key] = chunk_ids
+    
+    def colliders_in(self, rect):
+        """Colliders overlapping a world-space rect (x, y, w, h), e.g. for debug drawing"""
+        size = self.tile_size
+        x, y, w, h = rect
+        ids = set()
+        for row in range(max(y // size, 0), min((y + h - 1) // size + 1, self.height)):
+            base = row * self.width
+            ids.update(self.collider_ids[base + max(x // size, 0):base + min((x + w - 1) // size + 1, self.width)])
+        ids.discard(0)
+        return [self.colliders[collider_id] for collider_id in ids]
+    
+    def cell_mask(self, col, row):
+        """Neighbour mask of a single cell, computed directly"""
+        if not self.is_solid(col, row):
+            return 0
+        mask = 0
+        for bit, (dx, dy) in enumerate(NEIGHBOUR_OFFSETS.values()):
+            if self.is_solid(col + dx, row + dy):
+                mask |= 1 << bit
+        return mask
+    
+    def mask_at(self, col, row):
+        """Cached neighbour mask of a cell"""
+        return self.masks[row * self.width + col]
+    
+    def fill_block(self, left, top, width, cells):
+        """Write a block of 0/1 cell bytes (row-major, width cells wide) and refresh the masks around it"""
+        height = len(cells) // width
+        for row in range(height):
+            base = (top + row) * self.width + left
+            self.solid[base:base + width] = cells[row * width:(row + 1) * width]
+        
+        # The block's own masks and those of the cells bordering it
+        for row in range(max(top - 1, 0), min(top + height + 1, self.height)):
+            for col in range(max(left - 1, 0), min(left + width + 1, self.width)):
+                self.masks[row * self.width + col] = self.cell_mask(col, row)
+        
+        for chunk_y in range(top // TERRAIN_CHUNK_TILES, (top + height - 1) // TERRAIN_CHUNK_TILES + 1):
+            for chunk_x in range(left // TERRAIN_CHUNK_TILES, (left + width - 1) // TERRAIN_CHUNK_TILES + 1):
+                self.merge_chunk((chunk_x, chunk_y))
+    
+    def set_solid(self, col, row, solid):
+        """Edit one cell and refresh the masks of its 3x3 neighbourhood.
+        
+        Returns the in-bounds cells whose mask may have changed.
+        """
+        self.solid[row * self.width + col] = 1 if solid else 0
+        self.merge_chunk((col // TERRAIN_CHUNK_TILES, row // TERRAIN_CHUNK_TILES))
+        
+        changed = []
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                c, r = col + dx, row + dy
+                if 0 <= c < self.width and 0 <= r < self.height:
+                    self.masks[r * self.width + c] = self.cell_mask(c, r)
+                    changed.append((c, r))
+        return changed
+    
+    def resolve_horizontal(self, rect, direction_x):
+        """Push rect out of terrain after a horizontal move.
+        
+        Rows are scanned in the same order the old per-sprite loop used, but each
+        collider is tested once per row instead of once per cell: moving left, a hit
+        pushes the rect past the collider's whole span (where the cell-by-cell push
+        would have cascaded to), and moving right it stops at the first cell hit,
+        so the result matches the per-sprite loop exactly.
+        """
+        size = self.tile_size
+        width = self.width
+        ids = self.collider_ids
+        colliders = self.colliders
+        
+        # Horizontal resolution never changes rect.y, so the rows are fixed
+        first_row = max(rect.top // size, 0)
+        last_row = min((rect.bottom - 1) // size, self.height - 1)
+        
+        for row in range(first_row, last_row + 1):
+            base = row * width
+            col = max(rect.left // size, 0)
+            while col < width and col * size < rect.right:
+                collider_id = ids[base + col]
+                if not collider_id:
+                    col += 1
+                    continue
+                
+                # Every cell the scan reaches overlaps the rect, so a collider found here is a hit
+                x, y, w, h = colliders[collider_id]
+                if direction_x < 0:  # Moving left
+                    rect.left = x + w
+                elif direction_x > 0:  # Moving right
+                    rect.right = col * size
+                col = (x + w) // size
+    
+    def resolve_vertical(self, rect, direction):
+        """Push rect out of terrain after a vertical move.
+        
+        Returns True if the rect landed on top of a cell. Only the first solid cell
+        in row-major order matters: it zeroes direction.y, after which the old
+        per-sprite loop changed nothing more.
+        """
+        size = self.tile_size
+        width = self.width
+        ids = self.collider_ids
+        if not direction.y:
+            return False
+        
+        # Vertical resolution never changes rect.x, so the columns are fixed
+        first_col = max(rect.left // size, 0)
+        last_col = min((rect.right - 1) // size, width - 1)
+        
+        row = max(rect.top // size, 0)
+        while row < self.height and row * size < rect.bottom:
+            base = row * width
+            for col in range(first_col, last_col + 1):
+                if ids[base + col]:
+                    if direction.y > 0:  # Falling
+                        rect.bottom = row * size
+                        direction.y = 0
+                        return True
+                    # Jumping
+                    rect.top = (row + 1) * size
+                    direction.y = 0
+                    return False
+            row += 1
+        
+        return False
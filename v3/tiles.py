@@ -1,6 +1,7 @@
+import math
 import pygame
 from settings import *
-from support import import_folder_dict, import_folder
+from support import import_folder_dict, import_folder, load_image
 
 class Tile(pygame.sprite.Sprite):
     def __init__(self, pos, size):
@@ -10,12 +11,12 @@ class Tile(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(topleft=pos)
 
 class TerrainTile(pygame.sprite.Sprite):
-    def __init__(self, pos, terrain_graphics=None):
+    def __init__(self, pos, terrain_graphics=None, terrain_key='X'):
         super().__init__()
         
         if terrain_graphics and 'X' in terrain_graphics:
-            # Use loaded terrain graphics
-            self.image = terrain_graphics['X']
+            # Use the loaded autotile picked for this cell's neighbours
+            self.image = terrain_graphics.get(terrain_key, terrain_graphics['X'])
         else:
             # Fallback to colored rectangle
             self.image = pygame.Surface((TILE_SIZE, TILE_SIZE))
@@ -24,92 +25,98 @@ class TerrainTile(pygame.sprite.Sprite):
         
         self.rect = self.image.get_rect(topleft=pos)
 
-class PalmFlag(pygame.sprite.Sprite):
-    def __init__(self, pos):
+class TerrainChunk(pygame.sprite.Sprite):
+    """Static terrain tiles pre-rendered into one surface, cropped to the tiles it holds"""
+    def __init__(self, tiles):
         super().__init__()
+        self.rect = tiles[0].rect.unionall([tile.rect for tile in tiles[1:]])
+        self.image = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        self.bake(tiles)
         
-        # Load palm animation frames
-        self.animation_frames = import_folder('graphics/terrain/palm/large_fg')
+        # Match the display's pixel format so drawing the chunk is a straight copy; headless levels have no display
+        if pygame.display.get_surface() is not None:
+            self.image = self.image.convert_alpha()
+    
+    def bake(self, tiles):
+        """Render the given tiles into the chunk surface"""
+        for tile in tiles:
+            self.image.blit(tile.image, (tile.rect.x - self.rect.x, tile.rect.y - self.rect.y))
+
+def load_palm_frames():
+    """Palm animation frames, or a simple flag if the palm graphics don't load"""
+    frames = import_folder('graphics/terrain/palm/large_fg')
+    if frames:
+        return frames
+    
+    image = pygame.Surface((64, 128))
+    image.fill(FLAG_COLOR)
+    pygame.draw.rect(image, (139, 69, 19), (2, 0, 8, 128))  # Brown pole
+    pygame.draw.rect(image, FLAG_COLOR, (10, 10, 48, 40))  # Flag
+    return [image]
+
+class PalmFlag(pygame.sprite.Sprite):
+    def __init__(self, pos, animations):
+        super().__init__()
         
-        if self.animation_frames:
-            # Use palm graphics
-            self.frame_index = 0
-            self.animation_speed = 4  # Slower animation for palm
-            self.image = self.animation_frames[0]
-        else:
-            # Fallback to simple flag if palm graphics don't load
-            self.image = pygame.Surface((64, 128))
-            self.image.fill(FLAG_COLOR)
-            pygame.draw.rect(self.image, (139, 69, 19), (2, 0, 8, 128))  # Brown pole
-            pygame.draw.rect(self.image, FLAG_COLOR, (10, 10, 48, 40))  # Flag
-            self.animation_frames = [self.image]
-            self.frame_index = 0
-            self.animation_speed = 0
+        # Palm frames come from the level's shared animation clock; slower animation for palm
+        self.animation = animations.track('palm', 4, load_palm_frames)
         
         # Position palm tree slightly above the platform to avoid root poking through
         self.rect = self.image.get_rect(topleft=pos)
         self.rect.y -= 20  # Move palm tree 20 pixels up
     
-    def animate(self, dt):
-        """Animate the palm tree"""
-        if len(self.animation_frames) > 1:
-            self.frame_index += self.animation_speed * dt
-            if self.frame_index >= len(self.animation_frames):
-                self.frame_index = 0
-            self.image = self.animation_frames[int(self.frame_index)]
+    @property
+    def image(self):
+        return self.animation.frame()
+
+def coin_float_offsets():
+    """Vertical float offset of a coin for each step of one bob cycle"""
+    return [round(COIN_FLOAT_AMPLITUDE * math.sin(2 * math.pi * step / COIN_FLOAT_STEPS))
+            for step in range(COIN_FLOAT_STEPS)]
+
+def load_coin_frames():
+    """Coin frame table: [spin frame][float offset] -> surface.
+    
+    Each spin frame is pre-drawn at every float offset inside a surface padded by
+    the float amplitude, so a floating coin keeps a fixed rect and never drifts.
+    """
+    frames = import_folder('graphics/items/gold')
+    if not frames:
+        # Fallback to simple yellow circle if coin graphics don't load
+        image = pygame.Surface((32, 32))
+        image.fill((0, 0, 0))  # Transparent background
+        image.set_colorkey((0, 0, 0))
+        pygame.draw.circle(image, (255, 215, 0), (16, 16), 14)  # Gold circle
+        pygame.draw.circle(image, (255, 255, 0), (16, 16), 14, 2)  # Gold outline
+        frames = [image]
     
-    def update(self, dt=1/60):
-        """Update the palm animation"""
-        self.animate(dt)
+    table = []
+    for frame in frames:
+        width, height = frame.get_size()
+        floats = []
+        for offset in coin_float_offsets():
+            padded = pygame.Surface((width, height + 2 * COIN_FLOAT_AMPLITUDE), pygame.SRCALPHA)
+            padded.blit(frame, (0, COIN_FLOAT_AMPLITUDE + offset))
+            floats.append(padded)
+        table.append(floats)
+    return table
 
 class Coin(pygame.sprite.Sprite):
-    def __init__(self, pos):
+    def __init__(self, pos, animations):
         super().__init__()
         
-        # Load coin animation frames
-        self.animation_frames = import_folder('graphics/items/gold')
+        # Spin and float positions are shared by all coins; medium speed animation for coins
+        self.spin = animations.track('coin', 6, load_coin_frames)
+        self.float = animations.track('coin_float', COIN_FLOAT_STEPS / COIN_FLOAT_PERIOD, coin_float_offsets)
         
-        if self.animation_frames:
-            # Use gold coin graphics
-            self.frame_index = 0
-            self.animation_speed = 6  # Medium speed animation for coins
-            self.image = self.animation_frames[0]
-        else:
-            # Fallback to simple yellow circle if coin graphics don't load
-            self.image = pygame.Surface((32, 32))
-            self.image.fill((0, 0, 0))  # Transparent background
-            self.image.set_colorkey((0, 0, 0))
-            pygame.draw.circle(self.image, (255, 215, 0), (16, 16), 14)  # Gold circle
-            pygame.draw.circle(self.image, (255, 255, 0), (16, 16), 14, 2)  # Gold outline
-            self.animation_frames = [self.image]
-            self.frame_index = 0
-            self.animation_speed = 0
+        # Per-coin phase offset so neighbouring coins don't spin and bob in lockstep
+        self.phase = pos[0] // TILE_SIZE + pos[1] // TILE_SIZE
         
         self.rect = self.image.get_rect(center=pos)
-        
-        # Add floating effect
-        self.float_offset = 0
-        self.float_speed = 3
-    
-    def animate(self, dt):
-        """Animate the coin spinning"""
-        if len(self.animation_frames) > 1:
-            self.frame_index += self.animation_speed * dt
-            if self.frame_index >= len(self.animation_frames):
-                self.frame_index = 0
-            self.image = self.animation_frames[int(self.frame_index)]
-    
-    def float_effect(self, dt):
-        """Add subtle floating effect to coins"""
-        self.float_offset += self.float_speed * dt
-        float_y = 3 * pygame.math.Vector2(0, 1).rotate(self.float_offset * 50).y
-        self.rect.centery = self.rect.centery + float_y * 0.1
     
-    def update(self, dt=1/60):
-        """Update coin animation and floating"""
-        self.animate(dt)
-        # Note: Floating effect disabled to avoid position drift
-        # self.float_effect(dt)
+    @property
+    def image(self):
+        return self.spin.frame(self.phase)[self.float.frame_index(self.phase * 5)]
 
 class Cloud(pygame.sprite.Sprite):
     def __init__(self, pos, cloud_type=1):
@@ -123,7 +130,7 @@ class Cloud(pygame.sprite.Sprite):
         }
         
         try:
-            self.image = pygame.image.load(cloud_files[cloud_type]).convert_alpha()
+            self.image = load_image(cloud_files[cloud_type])
         except:
             # Fallback to simple white cloud if graphics don't load
             self.image = pygame.Surface((80, 40))
@@ -162,6 +169,15 @@ class Flag(pygame.sprite.Sprite):
         pygame.draw.rect(self.image, FLAG_COLOR, (6, 5, 24, 20))
         self.rect = self.image.get_rect(topleft=pos)
 
+def bake_terrain_chunks(tiles, chunk_tiles=TERRAIN_CHUNK_TILES):
+    """Group terrain tiles into fixed-size chunks and bake each one into a TerrainChunk"""
+    chunk_px = chunk_tiles * TILE_SIZE
+    grouped = {}
+    for tile in tiles:
+        key = (tile.rect.x // chunk_px, tile.rect.y // chunk_px)
+        grouped.setdefault(key, []).append(tile)
+    return {key: TerrainChunk(chunk) for key, chunk in grouped.items()}
+
 def load_terrain_graphics():
     """Load terrain graphics from the graphics folder"""
     terrain_graphics = import_folder_dict('graphics/terrain/land')